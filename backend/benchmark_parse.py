@@ -0,0 +1,96 @@
+#!/usr/bin/env python3
+"""
+Benchmark for menu page parsing: BeautifulSoup (html.parser) strategies vs. the lxml fast path
+
+Usage:
+    python benchmark_parse.py                     # generated menu fixtures
+    python benchmark_parse.py saved_menu.html ... # menu pages saved from umassdining.com
+"""
+
+import sys
+import os
+import time
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from bs4 import BeautifulSoup
+from nutrition_scraper import UMassNutritionScraper
+
+ITEM_TEMPLATE = (
+    '<li class="lightbox-nutrition">'
+    '<a href="#inline" data-dish-name="{name}" data-serving-size="1 each" data-calories="{calories}" '
+    'data-total-fat="{fat}g" data-sat-fat="1g" data-trans-fat="0g" data-cholesterol="15mg" '
+    'data-sodium="420mg" data-total-carb="{carbs}g" data-dietary-fiber="2g" data-sugars="3g" '
+    'data-protein="{protein}g" data-healthfulness="50">{name}</a>'
+    '<span class="menu-item-icons"><img src="/icons/vegetarian.png" alt="Vegetarian"></span>'
+    '</li>'
+)
+
+
+def build_menu_fixture(stations: int, items_per_station: int) -> bytes:
+    """Menu page in the structure of umassdining.com location menus"""
+    parts = ['<html><head><title>Menu</title></head><body><div id="content_text">']
+    for meal in ('breakfast', 'lunch', 'dinner', 'latenight'):
+        parts.append(f'<div id="{meal}_menu" class="menu_item"><div class="menu-item-container">')
+        for station in range(stations):
+            parts.append(f'<h2 class="menu_category_name">Station {station}</h2><ul>')
+            for i in range(items_per_station):
+                parts.append(ITEM_TEMPLATE.format(
+                    name=f"{meal.title()} Dish {station}-{i}",
+                    calories=150 + i * 10, fat=5 + i % 7, carbs=20 + i % 11, protein=8 + i % 5,
+                ))
+            parts.append('</ul>')
+        parts.append('</div></div>')
+    parts.append('</div></body></html>')
+    return ''.join(parts).encode('utf-8')
+
+
+def parse_with_beautifulsoup(scraper: UMassNutritionScraper, content: bytes) -> int:
+    soup = BeautifulSoup(content, 'html.parser')
+    return len({item.name.lower() for item in scraper._parse_menu_tree(soup)})
+
+
+def parse_with_fast_path(scraper: UMassNutritionScraper, content: bytes) -> int:
+    return len(scraper._parse_menu_page(content, 'benchmark'))
+
+
+def time_per_page(func, scraper: UMassNutritionScraper, content: bytes, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(scraper, content)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    if len(sys.argv) > 1:
+        fixtures = {}
+        for path in sys.argv[1:]:
+            with open(path, 'rb') as f:
+                fixtures[os.path.basename(path)] = f.read()
+    else:
+        fixtures = {
+            "small (4 stations x 8 items)": build_menu_fixture(4, 8),
+            "medium (8 stations x 12 items)": build_menu_fixture(8, 12),
+            "large (12 stations x 20 items)": build_menu_fixture(12, 20),
+        }
+
+    scraper = UMassNutritionScraper()
+    print("⏱️  Menu page parse time (ms per page)")
+    print("=" * 72)
+    print(f"{'fixture':<34}{'items':>7}{'html.parser':>13}{'lxml fast':>11}{'speedup':>9}")
+    try:
+        for label, content in fixtures.items():
+            items = parse_with_fast_path(scraper, content)
+            baseline_items = parse_with_beautifulsoup(scraper, content)
+            if items != baseline_items:
+                print(f"   ⚠️  {label}: fast path found {items} items, BeautifulSoup found {baseline_items}")
+
+            repeat = 20
+            before = time_per_page(parse_with_beautifulsoup, scraper, content, repeat)
+            after = time_per_page(parse_with_fast_path, scraper, content, repeat)
+            print(f"{label:<34}{items:>7}{before:>13.2f}{after:>11.2f}{before / after:>8.1f}x")
+    finally:
+        scraper.close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Benchmark for meal list responses: per-item Pydantic models + response_model validation
+(previous path) vs. projected documents encoded directly with orjson
+
+Usage:
+    python benchmark_serialization.py          # 1,000 meals
+    python benchmark_serialization.py 5000     # custom meal count
+"""
+
+import sys
+import os
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import List
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse, ORJSONResponse
+from pydantic import TypeAdapter
+
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'benchmark')
+from server import MealLog
+
+MEAL_LIST = TypeAdapter(List[MealLog])
+
+
+def build_meal_documents(count: int) -> List[dict]:
+    """Meal log documents as stored in MongoDB by log_meal"""
+    documents = []
+    for i in range(count):
+        meal_id = str(uuid.uuid4())
+        documents.append({
+            "_id": meal_id,
+            "id": meal_id,
+            "user_id": "benchmark-user",
+            "food_name": f"Dish {i}",
+            "dining_location": "Berkshire",
+            "meal_type": "Lunch",
+            "portion_size": 1.0 + i % 3 * 0.5,
+            "calories": 150 + i % 400,
+            "protein": 8.0 + i % 5,
+            "carbs": 20.0 + i % 11,
+            "fat": 5.0 + i % 7,
+            "date": "2024-01-01",
+            "logged_at": datetime.now(timezone.utc).isoformat(),
+        })
+    return documents
+
+
+def serialize_with_models(documents: List[dict]) -> bytes:
+    """Previous path: parse timestamps, build MealLog per item, validate via response_model, encode"""
+    meals = []
+    for document in documents:
+        meal = dict(document)
+        if isinstance(meal.get('logged_at'), str):
+            meal['logged_at'] = datetime.fromisoformat(meal['logged_at'])
+        meal['id'] = str(meal['_id'])
+        meals.append(MealLog(**meal))
+    validated = MEAL_LIST.validate_python(jsonable_encoder(meals))
+    return JSONResponse(jsonable_encoder(validated)).body
+
+
+def serialize_lean(documents: List[dict]) -> bytes:
+    """Current path: projected documents with _id mapped to id, encoded by orjson"""
+    meals = []
+    for document in documents:
+        meal = dict(document)
+        del meal['id']  # not part of the projection
+        meal['id'] = str(meal.pop('_id'))
+        meals.append(meal)
+    return ORJSONResponse(meals).body
+
+
+def time_per_call(func, documents: List[dict], repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        func(documents)
+    return (time.perf_counter() - start) / repeat * 1000
+
+
+def main():
+    count = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    documents = build_meal_documents(count)
+
+    repeat = 20
+    before = time_per_call(serialize_with_models, documents, repeat)
+    after = time_per_call(serialize_lean, documents, repeat)
+
+    print(f"⏱️  Meal list serialization ({count} meals)")
+    print("=" * 72)
+    print(f"{'path':<44}{'ms total':>12}{'ms / 1,000':>14}")
+    print(f"{'Pydantic models + response_model + json':<44}{before:>12.2f}{before / count * 1000:>14.2f}")
+    print(f"{'projected documents + orjson':<44}{after:>12.2f}{after / count * 1000:>14.2f}")
+    print(f"speedup: {before / after:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Execution layer for blocking work called from async endpoints.
+
+The scraper and the dining site upstream calls use ``requests`` and BeautifulSoup,
+which block. Running them directly inside ``async def`` handlers freezes the event
+loop for every other request on the worker. ``BlockingRunner`` moves that work to a
+dedicated, bounded thread pool and caps how many calls each endpoint may have in
+flight, so scraping traffic queues on its own limits instead of starving the
+MongoDB-backed endpoints.
+"""
+
+import asyncio
+import functools
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class RunnerBusyError(Exception):
+    """Raised when an endpoint's concurrency limit stays exhausted past the queue timeout"""
+
+    def __init__(self, name: str):
+        super().__init__(f"Too many concurrent '{name}' requests")
+        self.name = name
+
+
+class BlockingRunner:
+    """Bounded thread pool with per-endpoint concurrency limits"""
+
+    def __init__(self, max_workers: int = 8, limits: Dict[str, int] = None,
+                 default_limit: int = 4, queue_timeout: float = 30.0):
+        self.max_workers = max_workers
+        self.default_limit = default_limit
+        self.queue_timeout = queue_timeout
+        self._limits = dict(limits or {})
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='blocking')
+
+    def _semaphore(self, name: str) -> asyncio.Semaphore:
+        if name not in self._semaphores:
+            self._semaphores[name] = asyncio.Semaphore(self._limits.get(name, self.default_limit))
+        return self._semaphores[name]
+
+    async def run(self, name: str, func: Callable, *args, queue_timeout: Optional[float] = None, **kwargs):
+        """Run func(*args, **kwargs) in the pool under the concurrency limit for `name`
+
+        `queue_timeout` bounds the wait for a free slot; every other keyword argument,
+        including `timeout`, is passed through to func.
+        """
+        semaphore = self._semaphore(name)
+        try:
+            await asyncio.wait_for(semaphore.acquire(), queue_timeout or self.queue_timeout)
+        except asyncio.TimeoutError:
+            raise RunnerBusyError(name)
+
+        try:
+            loop = asyncio.get_running_loop()
+            return await loop.run_in_executor(self._executor, functools.partial(func, *args, **kwargs))
+        finally:
+            semaphore.release()
+
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Configured limit and free slots per endpoint"""
+        return {
+            name: {"limit": self._limits.get(name, self.default_limit), "available": semaphore._value}
+            for name, semaphore in self._semaphores.items()
+        }
+
+    def shutdown(self):
+        """Stop the pool without waiting for queued work"""
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,128 @@
+#!/usr/bin/env python3
+"""
+Materialized per-day macro totals for the UMacro Tracker API.
+
+Every meal log write adjusts one ``daily_macros`` document keyed by (user_id, date)
+with an atomic ``$inc``, so the dashboard and history read a single small document per
+day instead of summing raw ``meal_logs``. ``rebuild_rollups`` recomputes the collection
+from ``meal_logs`` for existing data or to repair drift.
+
+Usage:
+    python daily_rollups.py                  # rebuild rollups for every user
+    python daily_rollups.py --user USER_ID   # rebuild rollups for one user
+"""
+
+import asyncio
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List, Optional
+
+from pymongo import UpdateOne
+from pymongo.errors import DuplicateKeyError
+
+logger = logging.getLogger(__name__)
+
+# Macro fields of a meal log and the rollup total each one is added to
+MACRO_TOTALS = {
+    "calories": "total_calories",
+    "protein": "total_protein",
+    "carbs": "total_carbs",
+    "fat": "total_fat",
+}
+
+
+def daily_totals_pipeline(match: Dict, group_by_user: bool = False) -> List[Dict]:
+    """Aggregation pipeline summing portion-adjusted macros per date for matching meal logs"""
+    group_id = {"user_id": "$user_id", "date": "$date"} if group_by_user else "$date"
+    group = {"_id": group_id, "meal_count": {"$sum": 1}}
+    for field, total in MACRO_TOTALS.items():
+        group[total] = {"$sum": {"$multiply": [f"${field}", "$portion_size"]}}
+    return [{"$match": match}, {"$group": group}]
+
+
+def _meal_increments(meal: Dict, sign: int) -> Dict[str, float]:
+    increments = {"meal_count": sign}
+    for field, total in MACRO_TOTALS.items():
+        increments[total] = sign * meal[field] * meal['portion_size']
+    return increments
+
+
+async def add_meal(db, meal: Dict):
+    """Add a newly logged meal to its day's rollup"""
+    query = {"user_id": meal['user_id'], "date": meal['date']}
+    update = {"$inc": _meal_increments(meal, 1)}
+    try:
+        await db.daily_macros.update_one(query, update, upsert=True)
+    except DuplicateKeyError:
+        # A concurrent upsert created the document first; it exists now
+        await db.daily_macros.update_one(query, update)
+
+
+async def remove_meal(db, meal: Dict):
+    """Subtract a deleted meal from its day's rollup, dropping the day once it is empty"""
+    query = {"user_id": meal['user_id'], "date": meal['date']}
+    await db.daily_macros.update_one(query, {"$inc": _meal_increments(meal, -1)})
+    await db.daily_macros.delete_one({**query, "meal_count": {"$lte": 0}})
+
+
+async def get_rollup(db, user_id: str, date: str) -> Optional[Dict]:
+    """Rollup for one day, or None when nothing was logged"""
+    return await db.daily_macros.find_one({"user_id": user_id, "date": date}, {"_id": 0})
+
+
+async def get_rollups(db, user_id: str, start_date: str, end_date: str) -> Dict[str, Dict]:
+    """Rollups of a user keyed by date, for dates between start_date and end_date inclusive"""
+    rollups = await db.daily_macros.find(
+        {"user_id": user_id, "date": {"$gte": start_date, "$lte": end_date}}, {"_id": 0}
+    ).to_list(length=None)
+    return {rollup['date']: rollup for rollup in rollups}
+
+
+async def rebuild_rollups(db, user_id: Optional[str] = None, batch_size: int = 1000) -> int:
+    """Recompute rollups from meal_logs (all users by default); returns the number of days written"""
+    match = {"user_id": user_id} if user_id else {}
+    await db.daily_macros.delete_many(match)
+
+    written = 0
+    batch = []
+    async for totals in db.meal_logs.aggregate(daily_totals_pipeline(match, group_by_user=True)):
+        key = totals.pop('_id')
+        batch.append(UpdateOne(key, {"$set": totals}, upsert=True))
+        if len(batch) >= batch_size:
+            await db.daily_macros.bulk_write(batch, ordered=False)
+            written += len(batch)
+            batch = []
+    if batch:
+        await db.daily_macros.bulk_write(batch, ordered=False)
+        written += len(batch)
+
+    logger.info(f"Rebuilt {written} daily macro rollups" + (f" for user {user_id}" if user_id else ""))
+    return written
+
+
+async def ensure_rollups(db):
+    """Backfill rollups once for databases that have meal logs but no rollups yet"""
+    if await db.daily_macros.find_one() is None and await db.meal_logs.find_one() is not None:
+        await rebuild_rollups(db)
+
+
+async def main(user_id: Optional[str] = None):
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(Path(__file__).parent / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    try:
+        written = await rebuild_rollups(db, user_id)
+        print(f"✅ Rebuilt {written} daily macro rollups")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    user = sys.argv[sys.argv.index("--user") + 1] if "--user" in sys.argv else None
+    asyncio.run(main(user))
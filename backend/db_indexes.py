@@ -0,0 +1,146 @@
+#!/usr/bin/env python3
+"""
+MongoDB index management for the UMacro Tracker API.
+
+``ensure_indexes`` runs at startup and creates the indexes backing every query shape
+in server.py and daily_rollups.py. ``verify_indexes`` explains each of those shapes and flags any that still
+plans a collection scan (COLLSCAN).
+
+Usage:
+    python db_indexes.py           # create indexes, then print the verification report
+    python db_indexes.py --verify  # only print the verification report
+"""
+
+import asyncio
+import logging
+import os
+import sys
+from pathlib import Path
+from typing import Dict, List
+
+from pymongo import ASCENDING, DESCENDING, IndexModel
+from pymongo.errors import OperationFailure
+
+logger = logging.getLogger(__name__)
+
+# Collection -> indexes matching the queries issued by server.py
+INDEXES: Dict[str, List[IndexModel]] = {
+    "users": [
+        IndexModel([("id", ASCENDING)], name="id_unique", unique=True),
+        IndexModel([("email", ASCENDING)], name="email_unique", unique=True),
+    ],
+    "meal_logs": [
+        # Per-day meal lists, date range exports and per-user rollup rebuilds
+        IndexModel([("user_id", ASCENDING), ("date", ASCENDING)], name="user_date"),
+        # Most recent logs of a user (search personalization)
+        IndexModel([("user_id", ASCENDING), ("logged_at", DESCENDING)], name="user_logged_at"),
+    ],
+    "favorites": [
+        # Duplicate check, favorite check by name and per-user listing (prefixes)
+        IndexModel(
+            [("user_id", ASCENDING), ("name", ASCENDING), ("dining_location", ASCENDING)],
+            name="user_name_location_unique", unique=True,
+        ),
+        # Keeps per-user lookups off a collection scan while duplicates left by the old
+        # check-then-insert race still block the unique index
+        IndexModel([("user_id", ASCENDING)], name="user_id"),
+    ],
+    "daily_macros": [
+        # One rollup per user and day; also serves history date ranges
+        IndexModel([("user_id", ASCENDING), ("date", ASCENDING)], name="user_date_unique", unique=True),
+    ],
+    "menu_items": [
+        IndexModel([("menu_date", ASCENDING), ("location", ASCENDING)], name="menu_date_location"),
+    ],
+}
+
+# (collection, description, filter, sort) for every query shape in server.py
+QUERY_SHAPES = [
+    ("users", "user by email", {"email": "user@example.com"}, None),
+    ("users", "user by id", {"id": "user-id"}, None),
+    ("meal_logs", "meals of a day", {"user_id": "user-id", "date": "2024-01-01"}, None),
+    ("meal_logs", "meal by id and owner", {"_id": "meal-id", "user_id": "user-id"}, None),
+    ("meal_logs", "meals of a user (rollup rebuild)", {"user_id": "user-id"}, None),
+    ("meal_logs", "meals over a date range", {"user_id": "user-id", "date": {"$gte": "2024-01-01", "$lte": "2024-12-31"}},
+     [("date", ASCENDING)]),
+    ("meal_logs", "recent meals of a user", {"user_id": "user-id"}, [("logged_at", DESCENDING)]),
+    ("daily_macros", "rollup of a day", {"user_id": "user-id", "date": "2024-01-01"}, None),
+    ("daily_macros", "rollups over a date range", {"user_id": "user-id", "date": {"$gte": "2024-01-01", "$lte": "2024-01-14"}}, None),
+    ("favorites", "favorites of a user", {"user_id": "user-id"}, None),
+    ("favorites", "favorite by name", {"user_id": "user-id", "name": "Pizza"}, None),
+    ("favorites", "favorite by name and location",
+     {"user_id": "user-id", "name": "Pizza", "dining_location": "Berkshire"}, None),
+    ("menu_items", "menu snapshot of a date", {"menu_date": "2024-01-01"}, None),
+    ("menu_items", "menu snapshots of a location up to a date", {"location": "berkshire", "menu_date": {"$lte": "2024-01-01"}}, None),
+]
+
+
+async def ensure_indexes(db):
+    """Create all indexes; failures (e.g. duplicates blocking a unique index) are logged, not raised
+
+    Indexes are created one at a time, so one that fails doesn't keep the others on
+    its collection from being built.
+    """
+    for collection, indexes in INDEXES.items():
+        for index in indexes:
+            name = index.document["name"]
+            try:
+                await db[collection].create_indexes([index])
+                logger.info(f"Index ready on {collection}: {name}")
+            except OperationFailure as e:
+                logger.error(f"Could not create index {name} on {collection}: {e}")
+
+
+def _plan_stages(plan: Dict) -> List[str]:
+    """Stage names of a query plan tree, outermost first"""
+    stages = [plan.get("stage", "?")]
+    for key in ("inputStage", "queryPlan"):
+        if key in plan:
+            stages += _plan_stages(plan[key])
+    for child in plan.get("inputStages", []):
+        stages += _plan_stages(child)
+    return stages
+
+
+async def verify_indexes(db) -> List[Dict]:
+    """Explain every query shape and report its winning plan and whether it scans the collection"""
+    report = []
+    for collection, description, query, sort in QUERY_SHAPES:
+        cursor = db[collection].find(query)
+        if sort:
+            cursor = cursor.sort(sort)
+        explain = await cursor.explain()
+        stages = _plan_stages(explain["queryPlanner"]["winningPlan"])
+        report.append({
+            "collection": collection,
+            "query": description,
+            "stages": stages,
+            "collscan": "COLLSCAN" in stages,
+        })
+    return report
+
+
+async def main(verify_only: bool = False):
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(Path(__file__).parent / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'])
+    db = client[os.environ['DB_NAME']]
+    try:
+        if not verify_only:
+            await ensure_indexes(db)
+
+        report = await verify_indexes(db)
+        for entry in report:
+            status = "❌ COLLSCAN" if entry["collscan"] else "✅"
+            print(f"{status} {entry['collection']}: {entry['query']} ({' <- '.join(entry['stages'])})")
+        return not any(entry["collscan"] for entry in report)
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    ok = asyncio.run(main(verify_only="--verify" in sys.argv))
+    sys.exit(0 if ok else 1)
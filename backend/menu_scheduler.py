@@ -0,0 +1,137 @@
+"""
+Background refresh scheduler for menu snapshots.
+
+Starts with the FastAPI app and pre-warms every location shortly before each dining
+meal period (breakfast, lunch, dinner, late night), so requests only ever read the
+menu cache and snapshot store. Runs are jittered to avoid hitting the dining site on
+the exact minute, and locations that fail are retried with exponential back-off.
+"""
+
+import asyncio
+import logging
+import random
+import time
+from datetime import datetime, timedelta
+from typing import Dict, Iterable, Optional
+
+from menu_store import MenuSnapshotStore
+from nutrition_scraper import DINING_TZ, MEAL_PERIODS, current_menu_date, dining_now
+
+logger = logging.getLogger(__name__)
+
+
+class MenuRefreshScheduler:
+    """Pre-warms menu snapshots before each meal period"""
+
+    def __init__(self, store: MenuSnapshotStore, prewarm_minutes: int = 30, jitter_seconds: int = 120,
+                 retry_base_seconds: int = 30, retry_max_seconds: int = 15 * 60, max_retries: int = 5):
+        self.store = store
+        self.prewarm = timedelta(minutes=prewarm_minutes)
+        self.jitter_seconds = jitter_seconds
+        self.retry_base_seconds = retry_base_seconds
+        self.retry_max_seconds = retry_max_seconds
+        self.max_retries = max_retries
+
+        self._task: Optional[asyncio.Task] = None
+        self._triggered: Optional[asyncio.Task] = None
+        self._refresh_lock = asyncio.Lock()
+        self.next_run: Optional[datetime] = None
+        self.last_run: Optional[datetime] = None
+        self.last_failed: list = []
+
+    def next_run_after(self, now: datetime) -> datetime:
+        """Next pre-warm time: `prewarm` before the next meal period start (Amherst time)"""
+        now = now.astimezone(DINING_TZ)
+        for day in (now.date(), now.date() + timedelta(days=1)):
+            for _, start in MEAL_PERIODS:
+                run_at = datetime.combine(day, start, tzinfo=DINING_TZ) - self.prewarm
+                if run_at > now:
+                    return run_at
+        raise RuntimeError("No meal periods configured")
+
+    async def refresh(self, locations: Iterable[str] = None) -> Dict[str, int]:
+        """Refresh locations (all by default), retrying failures with exponential back-off"""
+        async with self._refresh_lock:
+            pending = list(locations or self.store.scraper.get_available_locations())
+            counts: Dict[str, int] = {}
+
+            for attempt in range(self.max_retries + 1):
+                if attempt:
+                    delay = min(self.retry_max_seconds, self.retry_base_seconds * 2 ** (attempt - 1))
+                    delay += random.uniform(0, self.retry_base_seconds)
+                    logger.warning(f"Retrying menu refresh for {pending} in {delay:.0f}s (attempt {attempt})")
+                    await asyncio.sleep(delay)
+
+                refreshed = await self.store.refresh_all(pending)
+                counts.update(refreshed)
+                pending = [location for location in pending if location not in refreshed]
+                if not pending:
+                    break
+
+            self.last_run = dining_now()
+            self.last_failed = pending
+            if pending:
+                logger.error(f"Menu refresh gave up on {pending} after {self.max_retries} retries")
+
+        try:
+            await self.store.refresh_popularity()
+        except Exception as e:
+            logger.error(f"Failed to refresh food popularity: {e}")
+        return counts
+
+    def trigger(self) -> bool:
+        """Start a full refresh in the background unless one is already running"""
+        if self._refresh_lock.locked() or (self._triggered and not self._triggered.done()):
+            return False
+        self._triggered = asyncio.create_task(self.refresh())
+        return True
+
+    async def _run(self):
+        # Warm anything missing from today's snapshots right away
+        status = self.store.status()
+        missing = [
+            location for location in self.store.scraper.get_available_locations()
+            if status.get(location, {}).get("menu_date") != current_menu_date()
+        ]
+        if missing:
+            try:
+                await self.refresh(missing)
+            except Exception as e:
+                logger.error(f"Initial menu refresh failed: {e}")
+
+        while True:
+            self.next_run = self.next_run_after(dining_now()) + timedelta(
+                seconds=random.uniform(0, self.jitter_seconds)
+            )
+            # Timestamps, not wall-clock differences, so a DST change does not shift the run
+            await asyncio.sleep(max(0.0, self.next_run.timestamp() - time.time()))
+            try:
+                await self.refresh()
+            except Exception as e:
+                logger.error(f"Scheduled menu refresh failed: {e}")
+
+    def start(self):
+        """Start the scheduler"""
+        if self._task is None:
+            self._task = asyncio.create_task(self._run())
+
+    async def stop(self):
+        """Stop the scheduler and any refresh it started"""
+        for task in (self._task, self._triggered):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except asyncio.CancelledError:
+                    pass
+        self._task = None
+        self._triggered = None
+
+    def status(self) -> Dict:
+        return {
+            "running": self._task is not None,
+            "refreshing": self._refresh_lock.locked(),
+            "next_run": self.next_run,
+            "last_run": self.last_run,
+            "last_failed": self.last_failed,
+        }
@@ -0,0 +1,177 @@
+"""
+Menu snapshot store for UMass dining nutrition data.
+
+Searches read from an in-memory snapshot of every location's menu instead of
+scraping on the request path. A background refresher scrapes each location and
+persists the parsed items to the ``menu_items`` collection, keyed by location and
+menu date, so a restarted worker can serve searches before its first refresh. Only
+the latest snapshot of each location is kept.
+Refreshes are driven by ``MenuRefreshScheduler`` (menu_scheduler.py).
+"""
+
+import asyncio
+import logging
+from dataclasses import asdict, fields
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Tuple
+
+from blocking import BlockingRunner
+from nutrition_scraper import UMassNutritionScraper, NutritionData, current_menu_date
+from search_index import FoodSearchIndex, name_key
+
+logger = logging.getLogger(__name__)
+
+NUTRITION_FIELDS = [f.name for f in fields(NutritionData)]
+
+
+class MenuSnapshotStore:
+    """Per-location menu snapshots backed by the menu_items collection"""
+
+    def __init__(self, db, scraper: UMassNutritionScraper, runner: BlockingRunner,
+                 refresh_timeout: int = 30 * 60):
+        self.collection = db.menu_items
+        self.meal_logs = db.meal_logs
+        self.scraper = scraper
+        self.runner = runner
+        self.refresh_timeout = refresh_timeout
+
+        # location key -> parsed items of the latest snapshot
+        self._snapshots: Dict[str, List[NutritionData]] = {}
+        self._menu_dates: Dict[str, str] = {}
+        self._refreshed_at: Dict[str, datetime] = {}
+
+        # Rebuilt off the event loop (and swapped in whole) whenever snapshots change
+        self.index = FoodSearchIndex()
+        self._index_generation = 0
+
+        # Canonical food name -> times logged, refreshed with the menus
+        self.popularity: Dict[str, int] = {}
+
+    async def load(self, menu_date: str = None):
+        """Load persisted snapshots for a menu date (today by default) into memory"""
+        menu_date = menu_date or current_menu_date()
+        docs = await self.collection.find({"menu_date": menu_date}).to_list(length=None)
+
+        snapshots: Dict[str, List[NutritionData]] = {}
+        for doc in docs:
+            item = NutritionData(**{name: doc.get(name) for name in NUTRITION_FIELDS})
+            snapshots.setdefault(doc['location'], []).append(item)
+
+        for location, items in snapshots.items():
+            self._snapshots[location] = items
+            self._menu_dates[location] = menu_date
+        await self._rebuild_index()
+        logger.info(f"Loaded {len(docs)} menu items for {len(snapshots)} locations ({menu_date})")
+
+    async def refresh_location(self, location: str) -> List[NutritionData]:
+        """Scrape one location, replace its snapshot for today's menu date and rebuild the index"""
+        items = await self._refresh_snapshot(location)
+        await self._rebuild_index()
+        return items
+
+    async def _refresh_snapshot(self, location: str) -> List[NutritionData]:
+        """Scrape one location and replace its snapshot, leaving the index as is"""
+        menu_date = current_menu_date()
+        items = await self.runner.run("menu_refresh", self.scraper.scrape_location, location,
+                                      use_cache=False, queue_timeout=self.refresh_timeout)
+
+        refreshed_at = datetime.now(timezone.utc)
+        docs = [
+            {**asdict(item), "location": location, "menu_date": menu_date, "refreshed_at": refreshed_at}
+            for item in items
+        ]
+        # Replaces this date's snapshot and prunes those of earlier dates, which load() never reads
+        await self.collection.delete_many({"location": location, "menu_date": {"$lte": menu_date}})
+        if docs:
+            await self.collection.insert_many(docs)
+
+        self._snapshots[location] = items
+        self._menu_dates[location] = menu_date
+        self._refreshed_at[location] = refreshed_at
+        return items
+
+    async def _rebuild_index(self):
+        """Build the index from the current snapshots on the blocking runner, then swap it in
+
+        Building takes tens of milliseconds for a full set of menus, too long to hold the
+        event loop. When rebuilds overlap, only the one started last is swapped in.
+        """
+        self._index_generation += 1
+        generation = self._index_generation
+        index = await self.runner.run("search_index", FoodSearchIndex, dict(self._snapshots))
+        if generation == self._index_generation:
+            self.index = index
+
+    async def refresh_all(self, locations: List[str] = None) -> Dict[str, int]:
+        """Refresh locations (all by default) concurrently, keeping the previous snapshot when a scrape fails
+
+        The index is rebuilt once, after every location has finished. Returns item counts
+        for the locations that refreshed successfully.
+        """
+        locations = locations or self.scraper.get_available_locations()
+        results = await asyncio.gather(
+            *(self._refresh_snapshot(location) for location in locations),
+            return_exceptions=True,
+        )
+
+        counts = {}
+        for location, result in zip(locations, results):
+            if isinstance(result, Exception):
+                logger.error(f"Failed to refresh menu snapshot for {location}: {result}")
+            else:
+                counts[location] = len(result)
+        if counts:
+            await self._rebuild_index()
+        return counts
+
+    async def refresh_popularity(self):
+        """Recount how often each food has been logged, for ranking suggestions"""
+        counts = await self.meal_logs.aggregate([
+            {"$group": {"_id": "$food_name", "count": {"$sum": 1}}}
+        ]).to_list(length=None)
+
+        popularity: Dict[str, int] = {}
+        for entry in counts:
+            if entry['_id']:
+                key = name_key(entry['_id'])
+                popularity[key] = popularity.get(key, 0) + entry['count']
+        self.popularity = popularity
+
+    def get_items(self, location: str = None) -> List[NutritionData]:
+        """Items from the current snapshot of one location, or of all locations"""
+        if location:
+            return list(self._snapshots.get(location, []))
+        return [item for items in self._snapshots.values() for item in items]
+
+    def search(self, food_name: str, location: str = None, fuzzy: bool = False) -> List[NutritionData]:
+        """Search the snapshot through the name index; never scrapes"""
+        if fuzzy:
+            return self.index.fuzzy_search(food_name, location)
+        return self.index.search(food_name, location)
+
+    def search_page(self, food_name: str, location: str = None, fuzzy: bool = False, offset: int = 0,
+                    limit: int = 50, boost: Callable[[str, str], float] = None) -> Tuple[List[NutritionData], int]:
+        """Ranked page of search results and the total match count
+
+        boost(location, canonical name) adds to an item's relevance score.
+        """
+        index = self.index
+        item_boost = None
+        if boost:
+            item_boost = lambda item_id: boost(index.item_locations[item_id], index.item_keys[item_id])
+        return index.ranked_page(food_name, location, fuzzy, offset, limit, item_boost)
+
+    def suggest(self, prefix: str, limit: int = 8, location: str = None) -> List[str]:
+        """Typeahead suggestions from the snapshot, ranked by logging popularity"""
+        return self.index.suggest(prefix, limit, self.popularity, location)
+
+    def status(self) -> Dict[str, Dict]:
+        """Snapshot size, menu date and refresh time per location"""
+        return {
+            location: {
+                "items_count": len(items),
+                "menu_date": self._menu_dates.get(location),
+                "refreshed_at": self._refreshed_at.get(location),
+            }
+            for location, items in self._snapshots.items()
+        }
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+One-time migration of ISO-string timestamps to native BSON dates.
+
+Older versions of server.py stored ``meal_logs.logged_at`` and ``favorites.created_at``
+as ISO strings. This converts every remaining string value in place; documents that
+already hold dates are left alone, so the migration can be re-run safely.
+
+Usage:
+    python migrate_timestamps.py            # convert all string timestamps
+    python migrate_timestamps.py --dry-run  # only count documents that need converting
+"""
+
+import asyncio
+import logging
+import os
+import sys
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Dict
+
+from pymongo import UpdateOne
+
+logger = logging.getLogger(__name__)
+
+# Collection -> timestamp field written as an ISO string by older versions
+TIMESTAMP_FIELDS = {
+    "meal_logs": "logged_at",
+    "favorites": "created_at",
+}
+
+
+def parse_timestamp(value: str) -> datetime:
+    """Datetime of an ISO string; values without an offset were written in UTC"""
+    parsed = datetime.fromisoformat(value.replace('Z', '+00:00'))
+    if parsed.tzinfo is None:
+        parsed = parsed.replace(tzinfo=timezone.utc)
+    return parsed
+
+
+async def migrate_collection(db, collection: str, field: str, batch_size: int = 1000,
+                             dry_run: bool = False) -> int:
+    """Convert string values of `field` to dates; returns the number of documents converted"""
+    query = {field: {"$type": "string"}}
+    if dry_run:
+        return await db[collection].count_documents(query)
+
+    converted = 0
+    batch = []
+    async for document in db[collection].find(query, {field: 1}):
+        try:
+            value = parse_timestamp(document[field])
+        except ValueError:
+            logger.error(f"Skipping {collection} {document['_id']}: unparseable {field} {document[field]!r}")
+            continue
+        # Only replace the value that was read, in case the document changed meanwhile
+        batch.append(UpdateOne({"_id": document['_id'], field: document[field]}, {"$set": {field: value}}))
+        if len(batch) >= batch_size:
+            converted += (await db[collection].bulk_write(batch, ordered=False)).modified_count
+            batch = []
+    if batch:
+        converted += (await db[collection].bulk_write(batch, ordered=False)).modified_count
+
+    logger.info(f"Converted {converted} {collection}.{field} values to dates")
+    return converted
+
+
+async def migrate_timestamps(db, dry_run: bool = False) -> Dict[str, int]:
+    """Migrate every known timestamp field; returns counts per collection"""
+    return {
+        collection: await migrate_collection(db, collection, field, dry_run=dry_run)
+        for collection, field in TIMESTAMP_FIELDS.items()
+    }
+
+
+async def main(dry_run: bool = False):
+    from dotenv import load_dotenv
+    from motor.motor_asyncio import AsyncIOMotorClient
+
+    load_dotenv(Path(__file__).parent / '.env')
+    client = AsyncIOMotorClient(os.environ['MONGO_URL'], tz_aware=True)
+    db = client[os.environ['DB_NAME']]
+    try:
+        counts = await migrate_timestamps(db, dry_run=dry_run)
+        verb = "need converting" if dry_run else "converted"
+        for collection, count in counts.items():
+            print(f"✅ {collection}.{TIMESTAMP_FIELDS[collection]}: {count} documents {verb}")
+    finally:
+        client.close()
+
+
+if __name__ == "__main__":
+    logging.basicConfig(level=logging.INFO)
+    asyncio.run(main(dry_run="--dry-run" in sys.argv))
@@ -1,17 +1,30 @@
 import requests
-from bs4 import BeautifulSoup
+from bs4 import BeautifulSoup, Tag
+from bs4.dammit import EncodingDetector
+import lxml.html
+from lxml import etree
 import re
 import logging
-from typing import List, Dict, Optional, Union
-from dataclasses import dataclass
+from typing import List, Dict, Optional, Union, Iterator, Iterable, Tuple, Hashable, Callable
+from dataclasses import dataclass, fields
+from datetime import datetime, time as dtime, timedelta, timezone
+from zoneinfo import ZoneInfo
+from collections import OrderedDict
+from functools import lru_cache
+import hashlib
+import string
+import sys
 import time
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from urllib.parse import urljoin, urlparse
+from requests.adapters import HTTPAdapter
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
-@dataclass
+@dataclass(slots=True)
 class NutritionData:
     """Structured nutrition data for a food item"""
     name: str
@@ -29,14 +42,272 @@ class NutritionData:
     total_sugars: Optional[float] = None
     protein: Optional[float] = None
 
+# data-* attribute -> NutritionData field -> value type, for menu item links
+NUTRITION_ATTRIBUTES = (
+    ('data-calories', 'calories', int),
+    ('data-protein', 'protein', float),
+    ('data-total-fat', 'total_fat', float),
+    ('data-sat-fat', 'saturated_fat', float),
+    ('data-trans-fat', 'trans_fat', float),
+    ('data-cholesterol', 'cholesterol', float),
+    ('data-sodium', 'sodium', float),
+    ('data-total-carb', 'total_carbohydrates', float),
+    ('data-dietary-fiber', 'dietary_fiber', float),
+    ('data-sugars', 'total_sugars', float),
+    ('data-serving-size', 'serving_size', str),
+)
+
+NON_NUMERIC_RE = re.compile(r'[^\d.]')
+UNIT_CHARS = string.ascii_letters + ' '
+
+@lru_cache(maxsize=4096)
+def parse_number(text: str) -> Optional[float]:
+    """Numeric value of text like "12g" or "420mg"
+    
+    Plain numbers with a trailing unit are parsed without a regex; anything else falls
+    back to stripping every non-numeric character. Menu values repeat heavily, so
+    results are memoized.
+    """
+    if not text:
+        return None
+    
+    text = text.strip()
+    number = text.rstrip(UNIT_CHARS)
+    if not number.replace('.', '', 1).isdigit():
+        number = NON_NUMERIC_RE.sub('', text)
+    try:
+        return float(number) if number else None
+    except ValueError:
+        return None
+
+class TokenBucket:
+    """Thread-safe token bucket used to pace requests to the dining site"""
+    
+    def __init__(self, rate: float, capacity: int = 1):
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = float(capacity)
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Block until a token is available, then take it"""
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            time.sleep(wait)
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into a single execution"""
+    
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[Hashable, Future] = {}
+        self.executions = 0
+        self.coalesced = 0
+    
+    def do(self, key: Hashable, func: Callable, *args):
+        """Run func(*args), or wait for the in-flight call with the same key"""
+        with self._lock:
+            future = self._calls.get(key)
+            leader = future is None
+            if leader:
+                future = Future()
+                self._calls[key] = future
+                self.executions += 1
+            else:
+                self.coalesced += 1
+        
+        if not leader:
+            return future.result()
+        
+        try:
+            result = func(*args)
+            future.set_result(result)
+            return result
+        except BaseException as e:
+            future.set_exception(e)
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "executions": self.executions,
+                "coalesced": self.coalesced,
+                "in_flight": len(self._calls),
+            }
+
+# UMass dining runs on Amherst time; servers (Railway, Render, Heroku) usually run in UTC
+DINING_TZ = ZoneInfo("America/New_York")
+
+def dining_now() -> datetime:
+    """Current time in the dining halls' time zone"""
+    return datetime.now(DINING_TZ)
+
+# Start of each dining meal period (Amherst time); menus change at these boundaries
+MEAL_PERIODS = [
+    ("Breakfast", dtime(7, 0)),
+    ("Lunch", dtime(11, 0)),
+    ("Dinner", dtime(16, 30)),
+    ("Late Night", dtime(21, 0)),
+]
+
+def next_meal_period_start(now: datetime = None) -> datetime:
+    """Next meal period boundary after `now`, rolling over to tomorrow's breakfast"""
+    now = (now or dining_now()).astimezone(DINING_TZ)
+    for _, start in MEAL_PERIODS:
+        boundary = datetime.combine(now.date(), start, tzinfo=DINING_TZ)
+        if boundary > now:
+            return boundary
+    return datetime.combine(now.date() + timedelta(days=1), MEAL_PERIODS[0][1], tzinfo=DINING_TZ)
+
+def estimate_size(items: List['NutritionData']) -> int:
+    """Approximate memory footprint of a parsed menu in bytes"""
+    size = sys.getsizeof(items)
+    for item in items:
+        size += sys.getsizeof(item) + sum(sys.getsizeof(getattr(item, f.name)) for f in fields(item))
+    return size
+
+class MenuCache:
+    """Bounded TTL + LRU cache of parsed menus keyed by (location, menu date)
+    
+    Entries expire at the next meal period boundary or after `ttl` seconds, whichever
+    comes first. When the estimated footprint exceeds `max_bytes`, the least recently
+    used entries are evicted.
+    """
+    
+    def __init__(self, max_bytes: int = 8 * 1024 * 1024, ttl: int = 3 * 60 * 60):
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+        self._entries: 'OrderedDict[Tuple[str, str], Tuple[List[NutritionData], int, datetime]]' = OrderedDict()
+        self._bytes = 0
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+    
+    def get(self, key: Tuple[str, str]) -> Optional[List['NutritionData']]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and entry[2] <= datetime.now(timezone.utc):
+                self._remove(key)
+                entry = None
+            if entry is None:
+                self.misses += 1
+                return None
+            self._entries.move_to_end(key)
+            self.hits += 1
+            return entry[0]
+    
+    def set(self, key: Tuple[str, str], items: List['NutritionData']):
+        # Expiry is kept in UTC so comparisons are not skewed by DST transitions
+        now = datetime.now(timezone.utc)
+        expires_at = min(now + timedelta(seconds=self.ttl), next_meal_period_start(now).astimezone(timezone.utc))
+        size = estimate_size(items)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            self._entries[key] = (items, size, expires_at)
+            self._bytes += size
+            while self._bytes > self.max_bytes and len(self._entries) > 1:
+                self._remove(next(iter(self._entries)))
+                self.evictions += 1
+    
+    def invalidate(self, location: str = None) -> int:
+        """Drop cached menus for one location, or for every location; returns entries removed"""
+        with self._lock:
+            keys = [key for key in self._entries if location is None or key[0] == location]
+            for key in keys:
+                self._remove(key)
+            return len(keys)
+    
+    def _remove(self, key: Tuple[str, str]):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+    
+    def stats(self) -> Dict[str, int]:
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+# Class names marking card-based menu layouts and the food name inside a card
+CARD_CLASS_RE = re.compile(r'card|item|dish|food|menu-item', re.I)
+CARD_NAME_CLASS_RE = re.compile(r'name|title|dish|food', re.I)
+
+# Macros in card text, one named group per NutritionData field
+CARD_MACROS_RE = re.compile(
+    r'(?P<calories>\d+)\s*cal'
+    r'|(?P<protein>\d+(?:\.\d+)?)\s*g?\s*protein'
+    r'|(?P<total_fat>\d+(?:\.\d+)?)\s*g?\s*fat'
+    r'|(?P<total_carbohydrates>\d+(?:\.\d+)?)\s*g?\s*carb',
+    re.I,
+)
+CARD_MACRO_FIELDS = ('calories', 'protein', 'total_fat', 'total_carbohydrates')
+CARD_SERVING_RE = re.compile(r'serving.*?(\d+(?:\.\d+)?)\s*(oz|g|ml|cup|tbsp)', re.I)
+
+
+def _is_card(tag) -> bool:
+    """Whether a tag is a card-layout menu item container"""
+    return tag.name in ('div', 'article') and any(CARD_CLASS_RE.search(css_class) for css_class in tag.get('class') or [])
+
+
+# Menu items carrying their nutrition facts as data-* attributes (UMass dining structure)
+LIGHTBOX_XPATH = etree.XPath(
+    "//li[contains(concat(' ', normalize-space(@class), ' '), ' lightbox-nutrition ')]"
+)
+
+def current_menu_date() -> str:
+    """Menu date (Amherst time) in the same YYYY-MM-DD format used for meal logs"""
+    return dining_now().strftime('%Y-%m-%d')
+
 class UMassNutritionScraper:
     """Web scraper for UMass dining nutrition information"""
     
-    def __init__(self):
+    def __init__(self, max_concurrency: int = 4, requests_per_second: float = 2.0,
+                 cache_max_bytes: int = 8 * 1024 * 1024, cache_ttl: int = 3 * 60 * 60):
         self.session = requests.Session()
         self.session.headers.update({
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         })
+        # Size the connection pool so concurrent scrapes can share the session
+        adapter = HTTPAdapter(pool_connections=max_concurrency, pool_maxsize=max_concurrency)
+        self.session.mount('https://', adapter)
+        self.session.mount('http://', adapter)
+        
+        # Politeness: at most max_concurrency requests in flight per host,
+        # started no faster than requests_per_second
+        self.max_concurrency = max_concurrency
+        self.rate_limiter = TokenBucket(requests_per_second)
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._host_slots_lock = threading.Lock()
+        
+        # Concurrent scrapes of the same location and menu date share one fetch
+        self._single_flight = SingleFlight()
+        
+        # Parsed menus are reused until the meal period changes
+        self.cache = MenuCache(max_bytes=cache_max_bytes, ttl=cache_ttl)
+        
+        # Per-URL validators from the last fetch (ETag, Last-Modified, content hash)
+        # and the items parsed from it, for conditional refreshes
+        self._validators: Dict[str, Dict] = {}
+        self._validators_lock = threading.Lock()
+        self.not_modified = 0
+        self.unchanged_content = 0
         self.base_url = "https://umassdining.com"
         
         # Dining hall URL mappings
@@ -62,117 +333,78 @@ class UMassNutritionScraper:
         # All available locations
         self.all_locations = {**self.dining_halls, **self.campus_eateries}
     
+    def _host_slot(self, url: str) -> threading.BoundedSemaphore:
+        """Per-host semaphore capping concurrent requests to one host"""
+        host = urlparse(url).netloc
+        with self._host_slots_lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.max_concurrency)
+            return self._host_slots[host]
+    
+    def _fetch(self, url: str, headers: Dict[str, str] = None) -> requests.Response:
+        """GET a page within the per-host concurrency cap and rate limit"""
+        with self._host_slot(url):
+            self.rate_limiter.acquire()
+            response = self.session.get(url, headers=headers, timeout=15)
+        response.raise_for_status()
+        return response
+    
     def _extract_number_from_text(self, text: str) -> Optional[float]:
         """Extract numeric value from text, handling various formats"""
-        if not text:
-            return None
+        return parse_number(text)
+    
+    def _nutrition_from_link(self, nutrition_link, food_name: str) -> NutritionData:
+        """Build NutritionData from a nutrition link's data-* attributes
         
-        # Remove common units and extract numbers
-        cleaned = re.sub(r'[^\d.]', '', text.strip())
-        try:
-            return float(cleaned) if cleaned else None
-        except ValueError:
-            return None
+        Driven by NUTRITION_ATTRIBUTES; works with both BeautifulSoup tags and lxml
+        elements, which share .get()
+        """
+        values = {}
+        for attribute, field, kind in NUTRITION_ATTRIBUTES:
+            raw = nutrition_link.get(attribute)
+            if not raw:
+                continue
+            if kind is int:
+                try:
+                    values[field] = int(raw)
+                except ValueError:
+                    pass
+            elif kind is float:
+                values[field] = parse_number(raw)
+            else:
+                values[field] = raw
+        
+        return NutritionData(name=food_name, **values)
     
-    def _parse_nutrition_table(self, soup: BeautifulSoup) -> List[NutritionData]:
-        """Parse nutrition information from HTML tables"""
-        nutrition_items = []
+    def _parse_fast(self, content: bytes, encoding: Optional[str] = None) -> List[NutritionData]:
+        """Fast path: read li.lightbox-nutrition > a data attributes straight through lxml
         
-        # Look for nutrition items with data attributes (UMass dining structure)
-        nutrition_items_elements = soup.find_all(['li'], class_='lightbox-nutrition')
+        lxml falls back to latin-1 for pages without a <meta charset>, so the encoding is
+        always given explicitly: the HTTP charset, else the declared one, else UTF-8.
+        """
+        encoding = encoding or EncodingDetector.find_declared_encoding(content, is_html=True) or 'utf-8'
+        try:
+            parser = lxml.html.HTMLParser(encoding=encoding)
+            root = lxml.html.document_fromstring(content, parser=parser)
+        except (etree.ParserError, LookupError, ValueError):
+            return []
         
-        for item in nutrition_items_elements:
+        nutrition_items = []
+        for item in LIGHTBOX_XPATH(root):
             try:
-                # Find the anchor tag with nutrition data
-                nutrition_link = item.find('a')
-                if not nutrition_link:
+                nutrition_link = item.find('.//a')
+                if nutrition_link is None:
                     continue
                 
-                # Extract food name from data-dish-name attribute or link text
                 food_name = nutrition_link.get('data-dish-name')
                 if not food_name:
-                    food_name = nutrition_link.get_text(strip=True)
+                    food_name = ''.join(text.strip() for text in nutrition_link.itertext())
                 
                 if not food_name or len(food_name) < 2:
                     continue
                 
-                # Initialize nutrition data
-                nutrition = NutritionData(name=food_name)
-                
-                # Extract nutrition values from data attributes
-                if nutrition_link.get('data-calories'):
-                    try:
-                        nutrition.calories = int(nutrition_link.get('data-calories'))
-                    except (ValueError, TypeError):
-                        pass
-                
-                if nutrition_link.get('data-protein'):
-                    try:
-                        protein_text = nutrition_link.get('data-protein')
-                        nutrition.protein = self._extract_number_from_text(protein_text)
-                    except (ValueError, TypeError):
-                        pass
-                
-                if nutrition_link.get('data-total-fat'):
-                    try:
-                        fat_text = nutrition_link.get('data-total-fat')
-                        nutrition.total_fat = self._extract_number_from_text(fat_text)
-                    except (ValueError, TypeError):
-                        pass
+                nutrition = self._nutrition_from_link(nutrition_link, food_name)
                 
-                if nutrition_link.get('data-sat-fat'):
-                    try:
-                        sat_fat_text = nutrition_link.get('data-sat-fat')
-                        nutrition.saturated_fat = self._extract_number_from_text(sat_fat_text)
-                    except (ValueError, TypeError):
-                        pass
-                
-                if nutrition_link.get('data-trans-fat'):
-                    try:
-                        trans_fat_text = nutrition_link.get('data-trans-fat')
-                        nutrition.trans_fat = self._extract_number_from_text(trans_fat_text)
-                    except (ValueError, TypeError):
-                        pass
-                
-                if nutrition_link.get('data-cholesterol'):
-                    try:
-                        cholesterol_text = nutrition_link.get('data-cholesterol')
-                        nutrition.cholesterol = self._extract_number_from_text(cholesterol_text)
-                    except (ValueError, TypeError):
-                        pass
-                
-                if nutrition_link.get('data-sodium'):
-                    try:
-                        sodium_text = nutrition_link.get('data-sodium')
-                        nutrition.sodium = self._extract_number_from_text(sodium_text)
-                    except (ValueError, TypeError):
-                        pass
-                
-                if nutrition_link.get('data-total-carb'):
-                    try:
-                        carb_text = nutrition_link.get('data-total-carb')
-                        nutrition.total_carbohydrates = self._extract_number_from_text(carb_text)
-                    except (ValueError, TypeError):
-                        pass
-                
-                if nutrition_link.get('data-dietary-fiber'):
-                    try:
-                        fiber_text = nutrition_link.get('data-dietary-fiber')
-                        nutrition.dietary_fiber = self._extract_number_from_text(fiber_text)
-                    except (ValueError, TypeError):
-                        pass
-                
-                if nutrition_link.get('data-sugars'):
-                    try:
-                        sugars_text = nutrition_link.get('data-sugars')
-                        nutrition.total_sugars = self._extract_number_from_text(sugars_text)
-                    except (ValueError, TypeError):
-                        pass
-                
-                if nutrition_link.get('data-serving-size'):
-                    nutrition.serving_size = nutrition_link.get('data-serving-size')
-                
-                # Only add items that have at least some nutrition data
                 if any([nutrition.calories, nutrition.protein, nutrition.total_fat, nutrition.total_carbohydrates]):
                     nutrition_items.append(nutrition)
             
@@ -182,161 +414,183 @@ class UMassNutritionScraper:
         
         return nutrition_items
     
-    def _parse_nutrition_cards(self, soup: BeautifulSoup) -> List[NutritionData]:
-        """Parse nutrition information from card-based layouts"""
-        nutrition_items = []
+    def _parse_menu_tree(self, soup: BeautifulSoup) -> List[NutritionData]:
+        """Parse nutrition information in a single pass over the tree
         
-        # Look for nutrition cards or menu items
-        nutrition_cards = soup.find_all(['div', 'article'], class_=re.compile(r'card|item|dish|food|menu-item', re.I))
+        Each node is dispatched to the matching strategy: data-attribute items
+        (li.lightbox-nutrition) or card layouts. A card is parsed only when none of the
+        cards inside it yields an item: a wrapper such as a "menu-items" container would
+        merge its cards' text into one bogus item, while a name element like
+        div.item-name also matches the card classes but never yields an item itself.
+        Data-attribute items are returned first so they win over card duplicates when the
+        caller de-duplicates by name.
+        """
+        lightbox_items = []
+        card_items = []
         
-        for card in nutrition_cards:
-            try:
-                # Extract food name
-                name_elem = card.find(['h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'div', 'span'], 
-                                    class_=re.compile(r'name|title|dish|food', re.I))
-                if not name_elem:
-                    continue
-                
-                name = name_elem.get_text(strip=True)
-                if not name or len(name) < 2:
-                    continue
-                
-                # Initialize nutrition data
-                nutrition = NutritionData(name=name)
-                
-                # Look for nutrition information within the card
-                nutrition_text = card.get_text()
-                
-                # Extract calories
-                cal_match = re.search(r'(\d+)\s*cal', nutrition_text, re.I)
-                if cal_match:
-                    nutrition.calories = int(cal_match.group(1))
-                
-                # Extract protein
-                protein_match = re.search(r'(\d+(?:\.\d+)?)\s*g?\s*protein', nutrition_text, re.I)
-                if protein_match:
-                    nutrition.protein = float(protein_match.group(1))
-                
-                # Extract total fat
-                fat_match = re.search(r'(\d+(?:\.\d+)?)\s*g?\s*fat', nutrition_text, re.I)
-                if fat_match:
-                    nutrition.total_fat = float(fat_match.group(1))
-                
-                # Extract carbs
-                carb_match = re.search(r'(\d+(?:\.\d+)?)\s*g?\s*carb', nutrition_text, re.I)
-                if carb_match:
-                    nutrition.total_carbohydrates = float(carb_match.group(1))
-                
-                # Extract serving size
-                serving_match = re.search(r'serving.*?(\d+(?:\.\d+)?)\s*(oz|g|ml|cup|tbsp)', nutrition_text, re.I)
+        # Depth-first walk in document order. Cards are revisited after their subtree,
+        # with the number of card items found before entering them
+        stack: List[Tuple[Tag, Optional[int]]] = [(soup, None)]
+        while stack:
+            node, items_before = stack.pop()
+            if items_before is not None:
+                if len(card_items) == items_before:
+                    nutrition = self._parse_card(node)
+                    if nutrition:
+                        card_items.append(nutrition)
+                continue
+            
+            classes = node.get('class') or []
+            if node.name == 'li' and 'lightbox-nutrition' in classes:
+                nutrition = self._parse_lightbox_item(node)
+                if nutrition:
+                    lightbox_items.append(nutrition)
+            elif _is_card(node):
+                stack.append((node, len(card_items)))
+            
+            stack.extend((child, None) for child in reversed(node.contents) if isinstance(child, Tag))
+        
+        return lightbox_items + card_items
+    
+    def _parse_lightbox_item(self, item) -> Optional[NutritionData]:
+        """Parse a UMass dining menu item carrying its nutrition facts as data attributes"""
+        try:
+            # Find the anchor tag with nutrition data
+            nutrition_link = item.find('a')
+            if not nutrition_link:
+                return None
+            
+            # Extract food name from data-dish-name attribute or link text
+            food_name = nutrition_link.get('data-dish-name')
+            if not food_name:
+                food_name = nutrition_link.get_text(strip=True)
+            
+            if not food_name or len(food_name) < 2:
+                return None
+            
+            nutrition = self._nutrition_from_link(nutrition_link, food_name)
+            
+            # Only keep items that have at least some nutrition data
+            if any([nutrition.calories, nutrition.protein, nutrition.total_fat, nutrition.total_carbohydrates]):
+                return nutrition
+        
+        except Exception as e:
+            logger.warning(f"Error parsing nutrition item: {e}")
+        
+        return None
+    
+    def _parse_card(self, card) -> Optional[NutritionData]:
+        """Parse nutrition information from a card-based layout"""
+        try:
+            # Extract food name
+            name_elem = card.find(['h1', 'h2', 'h3', 'h4', 'h5', 'h6', 'div', 'span'], class_=CARD_NAME_CLASS_RE)
+            if not name_elem:
+                return None
+            
+            name = name_elem.get_text(strip=True)
+            if not name or len(name) < 2:
+                return None
+            
+            # Initialize nutrition data
+            nutrition = NutritionData(name=name)
+            
+            # Look for nutrition information within the card; the first match of each
+            # macro wins, found in a single scan of the card text
+            nutrition_text = card.get_text()
+            for match in CARD_MACROS_RE.finditer(nutrition_text):
+                field = match.lastgroup
+                if getattr(nutrition, field) is None:
+                    value = match.group(field)
+                    setattr(nutrition, field, int(value) if field == 'calories' else float(value))
+                    if all(getattr(nutrition, name) is not None for name in CARD_MACRO_FIELDS):
+                        break
+            
+            # Extract serving size
+            if 'serving' in nutrition_text.lower():
+                serving_match = CARD_SERVING_RE.search(nutrition_text)
                 if serving_match:
                     nutrition.serving_size = f"{serving_match.group(1)} {serving_match.group(2)}"
-                
-                # Only add items that have at least some nutrition data
-                if any([nutrition.calories, nutrition.protein, nutrition.total_fat, nutrition.total_carbohydrates]):
-                    nutrition_items.append(nutrition)
             
-            except Exception as e:
-                logger.warning(f"Error parsing nutrition card: {e}")
-                continue
+            # Only keep items that have at least some nutrition data
+            if any([nutrition.calories, nutrition.protein, nutrition.total_fat, nutrition.total_carbohydrates]):
+                return nutrition
         
-        # Also look for UMass dining structure in case it wasn't caught by the main parser
-        umass_items = soup.find_all(['li'], class_='lightbox-nutrition')
-        for item in umass_items:
-            try:
-                nutrition_link = item.find('a')
-                if not nutrition_link:
-                    continue
-                
-                food_name = nutrition_link.get('data-dish-name')
-                if not food_name:
-                    food_name = nutrition_link.get_text(strip=True)
-                
-                if not food_name or len(food_name) < 2:
-                    continue
-                
-                nutrition = NutritionData(name=food_name)
-                
-                # Extract from data attributes
-                if nutrition_link.get('data-calories'):
-                    try:
-                        nutrition.calories = int(nutrition_link.get('data-calories'))
-                    except (ValueError, TypeError):
-                        pass
-                
-                if nutrition_link.get('data-protein'):
-                    try:
-                        protein_text = nutrition_link.get('data-protein')
-                        nutrition.protein = self._extract_number_from_text(protein_text)
-                    except (ValueError, TypeError):
-                        pass
-                
-                if nutrition_link.get('data-total-fat'):
-                    try:
-                        fat_text = nutrition_link.get('data-total-fat')
-                        nutrition.total_fat = self._extract_number_from_text(fat_text)
-                    except (ValueError, TypeError):
-                        pass
-                
-                if nutrition_link.get('data-total-carb'):
-                    try:
-                        carb_text = nutrition_link.get('data-total-carb')
-                        nutrition.total_carbohydrates = self._extract_number_from_text(carb_text)
-                    except (ValueError, TypeError):
-                        pass
-                
-                if nutrition_link.get('data-serving-size'):
-                    nutrition.serving_size = nutrition_link.get('data-serving-size')
-                
-                if any([nutrition.calories, nutrition.protein, nutrition.total_fat, nutrition.total_carbohydrates]):
-                    nutrition_items.append(nutrition)
-            
-            except Exception as e:
-                logger.warning(f"Error parsing UMass nutrition item in cards: {e}")
-                continue
+        except Exception as e:
+            logger.warning(f"Error parsing nutrition card: {e}")
         
-        return nutrition_items
+        return None
     
-    def scrape_location(self, location_name: str) -> List[NutritionData]:
-        """Scrape nutrition data from a specific dining location"""
+    def scrape_location(self, location_name: str, use_cache: bool = True) -> List[NutritionData]:
+        """Scrape nutrition data from a specific dining location
+        
+        Served from the menu cache when possible; use_cache=False forces a fresh
+        scrape, which still refreshes the cache.
+        """
         location_name_lower = location_name.lower().replace(' ', '_')
         
         if location_name_lower not in self.all_locations:
             raise ValueError(f"Unknown location: {location_name}. Available locations: {list(self.all_locations.keys())}")
         
-        url = self.all_locations[location_name_lower]
+        key = (location_name_lower, current_menu_date())
+        if use_cache:
+            cached = self.cache.get(key)
+            if cached is not None:
+                return list(cached)
+        
+        return list(self._single_flight.do(key, self._scrape_and_cache, key))
+    
+    def _scrape_and_cache(self, key: Tuple[str, str]) -> List[NutritionData]:
+        items = self._scrape_location(key[0])
+        self.cache.set(key, items)
+        return items
+    
+    def _scrape_location(self, location_name: str) -> List[NutritionData]:
+        """Fetch and parse one location's menu page
+        
+        Refreshes are conditional: a 304 response, or a body whose hash matches the
+        previous fetch, reuses the previously parsed items without parsing again.
+        """
+        url = self.all_locations[location_name]
         logger.info(f"Scraping nutrition data from: {url}")
         
+        with self._validators_lock:
+            previous = self._validators.get(url)
+        
+        headers = {}
+        if previous:
+            if previous.get('etag'):
+                headers['If-None-Match'] = previous['etag']
+            if previous.get('last_modified'):
+                headers['If-Modified-Since'] = previous['last_modified']
+        
         try:
             # Fetch the page
-            response = self.session.get(url, timeout=15)
-            response.raise_for_status()
+            response = self._fetch(url, headers=headers)
             
-            # Parse HTML
-            soup = BeautifulSoup(response.content, 'html.parser')
+            if previous and response.status_code == 304:
+                self.not_modified += 1
+                logger.info(f"{location_name} menu not modified, reusing {len(previous['items'])} items")
+                return list(previous['items'])
             
-            # Try different parsing strategies
-            nutrition_items = []
+            content_hash = hashlib.sha256(response.content).hexdigest()
+            if previous and previous['content_hash'] == content_hash:
+                self.unchanged_content += 1
+                logger.info(f"{location_name} menu unchanged, reusing {len(previous['items'])} items")
+                items = previous['items']
+            else:
+                # requests reports ISO-8859-1 for text/html without a charset; only pass real ones
+                charset = response.encoding if 'charset' in response.headers.get('Content-Type', '').lower() else None
+                items = self._parse_menu_page(response.content, location_name, charset)
+                logger.info(f"Successfully scraped {len(items)} nutrition items from {location_name}")
             
-            # Strategy 1: Parse nutrition tables
-            nutrition_items.extend(self._parse_nutrition_table(soup))
-            
-            # Strategy 2: Parse nutrition cards
-            nutrition_items.extend(self._parse_nutrition_cards(soup))
-            
-            # Remove duplicates based on name and set location info
-            seen_names = set()
-            unique_items = []
-            for item in nutrition_items:
-                if item.name.lower() not in seen_names:
-                    seen_names.add(item.name.lower())
-                    # Set dining location and meal type
-                    item.dining_location = location_name.replace('_', ' ').title()
-                    item.meal_type = 'Lunch'  # Default meal type
-                    unique_items.append(item)
-            
-            logger.info(f"Successfully scraped {len(unique_items)} nutrition items from {location_name}")
-            return unique_items
+            with self._validators_lock:
+                self._validators[url] = {
+                    'etag': response.headers.get('ETag'),
+                    'last_modified': response.headers.get('Last-Modified'),
+                    'content_hash': content_hash,
+                    'items': items,
+                }
+            return list(items)
             
         except requests.RequestException as e:
             logger.error(f"Failed to fetch {url}: {e}")
@@ -345,8 +599,51 @@ class UMassNutritionScraper:
             logger.error(f"Error scraping {location_name}: {e}")
             raise
     
-    def scrape_all_locations(self) -> Dict[str, List[NutritionData]]:
+    def _parse_menu_page(self, content: bytes, location_name: str, encoding: Optional[str] = None) -> List[NutritionData]:
+        """Parse a menu page into unique nutrition items for a location
+        
+        `encoding` is the charset from the HTTP response, when it declares one
+        """
+        nutrition_items = self._parse_fast(content, encoding)
+        
+        # Fall back to the BeautifulSoup strategies when the fast path finds nothing
+        if not nutrition_items:
+            soup = BeautifulSoup(content, 'html.parser', from_encoding=encoding)
+            nutrition_items = self._parse_menu_tree(soup)
+        
+        # Remove duplicates based on name and set location info
+        seen_names = set()
+        unique_items = []
+        for item in nutrition_items:
+            if item.name.lower() not in seen_names:
+                seen_names.add(item.name.lower())
+                # Set dining location and meal type
+                item.dining_location = location_name.replace('_', ' ').title()
+                item.meal_type = 'Lunch'  # Default meal type
+                unique_items.append(item)
+        
+        return unique_items
+    
+    def iter_scrape_locations(self, locations: Iterable[str] = None) -> Iterator[Tuple[str, List[NutritionData], Optional[Exception]]]:
+        """Scrape locations concurrently, yielding (location, items, error) as each one finishes"""
+        locations = list(locations) if locations is not None else list(self.all_locations.keys())
+        
+        with ThreadPoolExecutor(max_workers=self.max_concurrency, thread_name_prefix='scrape') as executor:
+            futures = {executor.submit(self.scrape_location, location): location for location in locations}
+            for future in as_completed(futures):
+                location = futures[future]
+                try:
+                    yield location, future.result(), None
+                except Exception as e:
+                    logger.error(f"Failed to scrape {location}: {e}")
+                    yield location, [], e
+    
+    def scrape_all_locations(self, concurrent: bool = True) -> Dict[str, List[NutritionData]]:
         """Scrape nutrition data from all available locations"""
+        if concurrent:
+            results = {location: items for location, items, _ in self.iter_scrape_locations()}
+            return {location: results[location] for location in self.all_locations.keys()}
+        
         all_data = {}
         
         for location_name in self.all_locations.keys():
@@ -355,9 +652,6 @@ class UMassNutritionScraper:
                 nutrition_data = self.scrape_location(location_name)
                 all_data[location_name] = nutrition_data
                 
-                # Be respectful with rate limiting
-                time.sleep(1)
-                
             except Exception as e:
                 logger.error(f"Failed to scrape {location_name}: {e}")
                 all_data[location_name] = []
@@ -391,6 +685,28 @@ class UMassNutritionScraper:
             
             return results
     
+    def stats(self) -> Dict[str, Dict[str, int]]:
+        """Upstream load statistics for monitoring"""
+        return {
+            "single_flight": self._single_flight.stats(),
+            "cache": self.cache.stats(),
+            "conditional_fetch": {
+                "not_modified": self.not_modified,
+                "unchanged_content": self.unchanged_content,
+            },
+        }
+    
+    def invalidate(self, location: str = None) -> int:
+        """Forget cached menus and conditional-fetch validators for one location, or for all
+        
+        The next scrape then downloads and parses the page in full. Returns cache entries removed.
+        """
+        urls = [self.all_locations[location]] if location else list(self.all_locations.values())
+        with self._validators_lock:
+            for url in urls:
+                self._validators.pop(url, None)
+        return self.cache.invalidate(location)
+    
     def get_available_locations(self) -> List[str]:
         """Get list of all available dining locations"""
         return list(self.all_locations.keys())
@@ -0,0 +1,92 @@
+"""
+Worker pool for bcrypt password hashing and verification.
+
+Bcrypt is deliberately slow (hundreds of milliseconds per call). Running it inline in
+async handlers stalls every request on the worker during a login burst, so
+``PasswordHasher`` runs it on a dedicated thread pool (bcrypt releases the GIL). When
+more calls are waiting than the queue allows, new calls are rejected at once with
+``HashingBusyError`` so the endpoint can answer 503 with Retry-After instead of piling up.
+"""
+
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Callable, Dict
+
+from passlib.context import CryptContext
+
+
+class HashingBusyError(Exception):
+    """Raised when the hashing queue is full"""
+
+    def __init__(self, retry_after: int):
+        super().__init__("Too many concurrent login requests, please retry shortly")
+        self.retry_after = retry_after
+
+
+class PasswordHasher:
+    """Bounded bcrypt worker pool with queue-depth backpressure and timing metrics"""
+
+    def __init__(self, context: CryptContext, max_workers: int = 2, max_queue: int = 32, retry_after: int = 2):
+        self.context = context
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.retry_after = retry_after
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='bcrypt')
+
+        self._pending = 0
+        self.completed = 0
+        self.rejected = 0
+        self._hash_seconds = 0.0
+        self._max_hash_seconds = 0.0
+        self._wait_seconds = 0.0
+        self._max_wait_seconds = 0.0
+
+    async def hash(self, password: str) -> str:
+        return await self._submit(self.context.hash, password)
+
+    async def verify(self, plain_password: str, hashed_password: str) -> bool:
+        return await self._submit(self.context.verify, plain_password, hashed_password)
+
+    async def _submit(self, func: Callable, *args):
+        if self._pending >= self.max_workers + self.max_queue:
+            self.rejected += 1
+            raise HashingBusyError(self.retry_after)
+
+        def timed():
+            started = time.perf_counter()
+            result = func(*args)
+            return result, started, time.perf_counter()
+
+        self._pending += 1
+        queued_at = time.perf_counter()
+        try:
+            loop = asyncio.get_running_loop()
+            result, started, finished = await loop.run_in_executor(self._executor, timed)
+        finally:
+            self._pending -= 1
+
+        wait, latency = started - queued_at, finished - started
+        self.completed += 1
+        self._wait_seconds += wait
+        self._max_wait_seconds = max(self._max_wait_seconds, wait)
+        self._hash_seconds += latency
+        self._max_hash_seconds = max(self._max_hash_seconds, latency)
+        return result
+
+    def stats(self) -> Dict[str, float]:
+        completed = self.completed or 1
+        return {
+            "workers": self.max_workers,
+            "max_queue": self.max_queue,
+            "pending": self._pending,
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "avg_hash_ms": round(self._hash_seconds / completed * 1000, 1),
+            "max_hash_ms": round(self._max_hash_seconds * 1000, 1),
+            "avg_queue_wait_ms": round(self._wait_seconds / completed * 1000, 1),
+            "max_queue_wait_ms": round(self._max_wait_seconds * 1000, 1),
+        }
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,291 @@
+"""
+In-memory search index over menu item names.
+
+The index is rebuilt from the menu snapshots whenever menu data is refreshed, so
+queries never lowercase or scan every item name. Names are tokenized and normalized
+into words; each word has a posting list of item ids per location. A query matches the
+items whose words contain every query token, found by intersecting posting lists.
+Fuzzy queries also match words by trigram similarity, so typos like "chiken parm" still
+find "Chicken Parmesan". Results are ranked by match quality (exact, prefix, substring,
+word match) plus caller-supplied boosts, and paginated with heap-based top-k selection.
+Typeahead suggestions come from sorted arrays of distinct names per location, one entry
+per word start, searched with bisect.
+"""
+
+import heapq
+import re
+import unicodedata
+from bisect import bisect_left
+from collections import Counter
+from typing import Callable, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from nutrition_scraper import NutritionData
+
+TOKEN_RE = re.compile(r'[a-z0-9]+')
+
+# Bound on memoized query-token -> vocabulary lookups per index
+TERM_MATCH_CACHE_SIZE = 2048
+
+# Minimum trigram (Jaccard) similarity for a fuzzy word match, and the most indexed
+# words considered per query token, which bounds fuzzy search cost
+FUZZY_MIN_SIMILARITY = 0.3
+FUZZY_MAX_TERMS = 32
+
+# Suggestions for prefixes up to this length match a large share of all names, so they
+# are memoized (up to SUGGEST_CACHE_SIZE entries) until the popularity counts change
+SUGGEST_CACHE_PREFIX_LENGTH = 2
+SUGGEST_CACHE_SIZE = 2048
+
+
+def normalize(text: str) -> str:
+    """Lowercase and strip accents so "Jalapeño" matches "jalapeno" """
+    decomposed = unicodedata.normalize('NFKD', text.lower())
+    return ''.join(ch for ch in decomposed if not unicodedata.combining(ch))
+
+
+def tokenize(text: str) -> List[str]:
+    return TOKEN_RE.findall(normalize(text))
+
+
+def trigrams(word: str) -> Set[str]:
+    """Character trigrams of a word, padded so short words and word edges count"""
+    padded = f"  {word} "
+    return {padded[i:i + 3] for i in range(len(padded) - 2)}
+
+
+def name_key(name: str) -> str:
+    """Canonical form of a food name, used to merge duplicates across locations"""
+    return ' '.join(tokenize(name))
+
+
+class FoodSearchIndex:
+    """Inverted index of food name tokens -> location -> item ids"""
+
+    def __init__(self, snapshots: Mapping[str, Iterable[NutritionData]] = None):
+        self.items: List[NutritionData] = []
+        self.item_locations: List[str] = []
+        self.item_keys: List[str] = []
+        self._postings: Dict[str, Dict[str, Set[int]]] = {}
+        self._term_matches: Dict[str, List[str]] = {}
+        self._display_names: Dict[str, str] = {}
+        # Location (None for all locations) -> distinct (word-start key, name key) entries
+        prefix_entries: Dict[Optional[str], Set[Tuple[str, str]]] = {None: set()}
+
+        for location, items in (snapshots or {}).items():
+            for item in items:
+                item_id = len(self.items)
+                self.items.append(item)
+                self.item_locations.append(location)
+                tokens = tokenize(item.name)
+                key = ' '.join(tokens)
+                self.item_keys.append(key)
+                for token in set(tokens):
+                    self._postings.setdefault(token, {}).setdefault(location, set()).add(item_id)
+
+                self._display_names.setdefault(key, item.name)
+                # One sorted key per word start, so prefixes match any word of the name
+                location_entries = prefix_entries.setdefault(location, set())
+                for start in range(len(tokens)):
+                    entry = (' '.join(tokens[start:]), key)
+                    location_entries.add(entry)
+                    prefix_entries[None].add(entry)
+
+        self._vocabulary = sorted(self._postings)
+
+        # Trigram -> indexed words containing it, for fuzzy candidate generation
+        self._trigram_postings: Dict[str, List[str]] = {}
+        self._term_trigram_counts: Dict[str, int] = {}
+        for term in self._vocabulary:
+            term_trigrams = trigrams(term)
+            self._term_trigram_counts[term] = len(term_trigrams)
+            for trigram in term_trigrams:
+                self._trigram_postings.setdefault(trigram, []).append(term)
+
+        self._prefix_keys: Dict[Optional[str], List[str]] = {}
+        self._prefix_names: Dict[Optional[str], List[str]] = {}
+        for location, entries in prefix_entries.items():
+            entries = sorted(entries)
+            self._prefix_keys[location] = [prefix_key for prefix_key, _ in entries]
+            self._prefix_names[location] = [key for _, key in entries]
+
+        self._suggestions: Dict[Tuple[str, Optional[str], int], List[str]] = {}
+        self._suggestions_popularity: Optional[Mapping[str, int]] = None
+
+    def __len__(self) -> int:
+        return len(self.items)
+
+    def _matching_terms(self, token: str) -> List[str]:
+        """Indexed words containing the query token
+
+        A word containing the token contains each of its trigrams, so only the words in
+        the rarest trigram's posting list are checked. Tokens under three characters have
+        no trigram and fall back to scanning the vocabulary; results are memoized.
+        """
+        terms = self._term_matches.get(token)
+        if terms is None:
+            if len(token) >= 3:
+                candidates = min(
+                    (self._trigram_postings.get(token[i:i + 3], ()) for i in range(len(token) - 2)),
+                    key=len,
+                )
+            else:
+                candidates = self._vocabulary
+            terms = [term for term in candidates if token in term]
+            if len(self._term_matches) >= TERM_MATCH_CACHE_SIZE:
+                self._term_matches.clear()
+            self._term_matches[token] = terms
+        return terms
+
+    def _postings_for(self, token: str, location: str = None) -> Set[int]:
+        matches: Set[int] = set()
+        for term in self._matching_terms(token):
+            by_location = self._postings[term]
+            if location:
+                matches |= by_location.get(location, set())
+            else:
+                for item_ids in by_location.values():
+                    matches |= item_ids
+        return matches
+
+    def search_ids(self, query: str, location: str = None) -> List[int]:
+        """Ids of items whose name words contain every query token, in index order"""
+        tokens = sorted(set(tokenize(query)), key=len, reverse=True)
+        if not tokens:
+            return []
+
+        # Longest tokens first: they tend to have the shortest posting lists
+        result = self._postings_for(tokens[0], location)
+        for token in tokens[1:]:
+            if not result:
+                break
+            result &= self._postings_for(token, location)
+        return sorted(result)
+
+    def search(self, query: str, location: str = None) -> List[NutritionData]:
+        """Items matching a substring or multi-word query, optionally within one location"""
+        return [self.items[item_id] for item_id in self.search_ids(query, location)]
+
+    def _fuzzy_terms(self, token: str) -> Dict[str, float]:
+        """Indexed words matching a query token, with their similarity to it
+
+        Words containing the token score 1.0. Otherwise only the FUZZY_MAX_TERMS words
+        sharing the most trigrams with the token are scored.
+        """
+        similarities = {term: 1.0 for term in self._matching_terms(token)}
+
+        token_trigrams = trigrams(token)
+        shared = Counter()
+        for trigram in token_trigrams:
+            shared.update(self._trigram_postings.get(trigram, ()))
+
+        for term, count in shared.most_common(FUZZY_MAX_TERMS):
+            if term in similarities:
+                continue
+            similarity = count / (len(token_trigrams) + self._term_trigram_counts[term] - count)
+            if similarity >= FUZZY_MIN_SIMILARITY:
+                similarities[term] = similarity
+        return similarities
+
+    def fuzzy_search_scored(self, query: str, location: str = None) -> List[Tuple[int, float]]:
+        """(item id, score) for items matching every query token fuzzily, best first
+
+        An item's score is the mean over query tokens of its best word similarity.
+        """
+        tokens = list(dict.fromkeys(tokenize(query)))
+        if not tokens:
+            return []
+
+        scores: Dict[int, float] = {}
+        for position, token in enumerate(tokens):
+            best: Dict[int, float] = {}
+            for term, similarity in self._fuzzy_terms(token).items():
+                by_location = self._postings[term]
+                id_sets = [by_location.get(location, set())] if location else by_location.values()
+                for item_ids in id_sets:
+                    for item_id in item_ids:
+                        if position and item_id not in scores:
+                            continue
+                        if similarity > best.get(item_id, 0.0):
+                            best[item_id] = similarity
+            scores = {item_id: scores.get(item_id, 0.0) + similarity for item_id, similarity in best.items()}
+            if not scores:
+                return []
+
+        ranked = sorted(scores.items(), key=lambda entry: (-entry[1], entry[0]))
+        return [(item_id, total / len(tokens)) for item_id, total in ranked]
+
+    def fuzzy_search(self, query: str, location: str = None) -> List[NutritionData]:
+        """Typo-tolerant search, best matches first"""
+        return [self.items[item_id] for item_id, _ in self.fuzzy_search_scored(query, location)]
+
+    def _match_quality(self, item_id: int, query_key: str) -> float:
+        name = self.item_keys[item_id]
+        if name == query_key:
+            return 1.0
+        if name.startswith(query_key):
+            return 0.75
+        if query_key in name:
+            return 0.5
+        return 0.25
+
+    def ranked_page(self, query: str, location: str = None, fuzzy: bool = False, offset: int = 0,
+                    limit: int = 50, boost: Optional[Callable[[int], float]] = None) -> Tuple[List[NutritionData], int]:
+        """One page of matches, best first, and the total number of matches
+
+        Score is match quality (exact 1.0, prefix 0.75, substring 0.5, word match 0.25;
+        fuzzy-only matches scale 0.25 by their similarity) plus boost(item_id). Only the
+        top offset + limit entries are kept while ranking.
+        """
+        query_key = name_key(query)
+        if fuzzy:
+            scored = self.fuzzy_search_scored(query, location)
+        else:
+            scored = [(item_id, 1.0) for item_id in self.search_ids(query, location)]
+
+        def score(entry: Tuple[int, float]) -> float:
+            item_id, similarity = entry
+            quality = self._match_quality(item_id, query_key)
+            if quality == 0.25:
+                quality *= similarity
+            return quality + (boost(item_id) if boost else 0.0)
+
+        top = heapq.nsmallest(offset + limit, scored, key=lambda entry: (-score(entry), entry[0]))
+        return [self.items[item_id] for item_id, _ in top[offset:]], len(scored)
+
+    def suggest(self, prefix: str, limit: int = 8, popularity: Mapping[str, int] = None,
+                location: str = None) -> List[str]:
+        """Distinct names with a word starting with `prefix`, most popular first
+
+        Every name matching the prefix in the location is ranked, so popular names are
+        found however many others share the prefix. Results for short prefixes are
+        memoized until a different popularity mapping is passed.
+        """
+        prefix = name_key(prefix)
+        if not prefix:
+            return []
+        if popularity is not self._suggestions_popularity:
+            self._suggestions.clear()
+            self._suggestions_popularity = popularity
+        popularity = popularity or {}
+        location = location or None
+        cache_key = (prefix, location, limit)
+        cached = self._suggestions.get(cache_key)
+        if cached is not None:
+            return list(cached)
+
+        prefix_keys = self._prefix_keys.get(location, [])
+        # Keys hold only [a-z0-9 ], so every key starting with the prefix sorts below prefix + '~'
+        start = bisect_left(prefix_keys, prefix)
+        end = bisect_left(prefix_keys, prefix + '~', start)
+        candidates = set(self._prefix_names[location][start:end]) if end > start else set()
+
+        def rank(key: str):
+            name = self._display_names[key]
+            return -popularity.get(key, 0), len(name), name
+
+        suggestions = [self._display_names[key] for key in heapq.nsmallest(limit, candidates, key=rank)]
+        if len(prefix) <= SUGGEST_CACHE_PREFIX_LENGTH:
+            if len(self._suggestions) >= SUGGEST_CACHE_SIZE:
+                self._suggestions.clear()
+            self._suggestions[cache_key] = suggestions
+        return suggestions
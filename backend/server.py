@@ -1,16 +1,21 @@
-from fastapi import FastAPI, APIRouter, HTTPException, Depends, status
+from fastapi import FastAPI, APIRouter, HTTPException, Depends, Header, Query, Response, status
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from dotenv import load_dotenv
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from starlette.middleware.cors import CORSMiddleware
 from motor.motor_asyncio import AsyncIOMotorClient
 from passlib.context import CryptContext
 from jose import JWTError, jwt
 from datetime import datetime, timedelta, timezone
-from typing import List, Optional
+from typing import AsyncIterator, Dict, List, Optional
+from collections import Counter
 import os
+import asyncio
 import logging
+import orjson
 import requests
 from bson import ObjectId
+from pymongo.errors import DuplicateKeyError
 
 import uuid
 from pathlib import Path
@@ -18,13 +23,23 @@ from pydantic import BaseModel, Field, EmailStr
 
 # Import the nutrition scraper
 from nutrition_scraper import UMassNutritionScraper, NutritionData
+from menu_store import MenuSnapshotStore
+from menu_scheduler import MenuRefreshScheduler
+from blocking import BlockingRunner, RunnerBusyError
+from upstream_cache import StaleWhileRevalidateCache
+from user_cache import UserCache
+from password_hashing import PasswordHasher, HashingBusyError
+from db_indexes import ensure_indexes
+from daily_rollups import add_meal, remove_meal, get_rollup, get_rollups, ensure_rollups
+from search_index import name_key
 
 ROOT_DIR = Path(__file__).parent
 load_dotenv(ROOT_DIR / '.env')
 
 # MongoDB connection
 mongo_url = os.environ['MONGO_URL']
-client = AsyncIOMotorClient(mongo_url)
+# tz_aware: BSON dates come back as UTC-aware datetimes and serialize with their offset
+client = AsyncIOMotorClient(mongo_url, tz_aware=True)
 db = client[os.environ['DB_NAME']]
 
 # Security setup
@@ -33,15 +48,50 @@ ALGORITHM = "HS256"
 ACCESS_TOKEN_EXPIRE_MINUTES = 30 * 24 * 60  # 30 days
 
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
+
+# Bcrypt runs on its own worker pool; a full queue answers 503 with Retry-After
+password_hasher = PasswordHasher(
+    pwd_context,
+    max_workers=int(os.environ.get('HASH_WORKERS', '2')),
+    max_queue=int(os.environ.get('HASH_MAX_QUEUE', '32')),
+)
 security = HTTPBearer()
+optional_security = HTTPBearer(auto_error=False)
+
+# Authenticated users by id; call user_cache.invalidate(user_id) whenever a user changes
+user_cache = UserCache(max_size=10_000, ttl=300)
+
+# Recent meal logs considered when personalizing search ranking
+SEARCH_HISTORY_LIMIT = 200
+
+# Per-user food/location logging counters for search ranking, keyed by user id; dropped
+# whenever the user logs or deletes a meal, so typeahead searches skip the aggregation
+food_history_cache = UserCache(max_size=10_000, ttl=300)
+
+# Admin endpoints are disabled unless ADMIN_TOKEN is set
+ADMIN_TOKEN = os.environ.get('ADMIN_TOKEN')
 
 # Create the main app
-app = FastAPI(title="UMacro Tracker API")
+app = FastAPI(title="UMacro Tracker API", default_response_class=ORJSONResponse)
 api_router = APIRouter(prefix="/api")
 
 # Initialize nutrition scraper
 nutrition_scraper = UMassNutritionScraper()
 
+# Blocking scraper/upstream calls run off the event loop, with per-endpoint limits
+blocking_runner = BlockingRunner(
+    max_workers=int(os.environ.get('BLOCKING_MAX_WORKERS', '8')),
+    limits={
+        "dining_locations": 2,
+        "menu_refresh": nutrition_scraper.max_concurrency,
+        "search_index": 1,
+    },
+)
+
+# Menu snapshots served to searches, pre-warmed before each meal period
+menu_store = MenuSnapshotStore(db, nutrition_scraper, runner=blocking_runner)
+menu_scheduler = MenuRefreshScheduler(menu_store)
+
 # Pydantic Models
 class UserCreate(BaseModel):
     username: str
@@ -120,12 +170,129 @@ class DailyMacros(BaseModel):
     total_fat: float
     meal_count: int
 
+class DashboardData(BaseModel):
+    date: str
+    macros: DailyMacros
+    meals: List[MealLog]
+    history: Dict[str, DailyMacros]
+    favorites: List[FavoriteFood]
+
 # Utility functions
-def hash_password(password: str) -> str:
-    return pwd_context.hash(password)
+async def hash_password(password: str) -> str:
+    try:
+        return await password_hasher.hash(password)
+    except HashingBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+async def verify_password(plain_password: str, hashed_password: str) -> bool:
+    try:
+        return await password_hasher.verify(plain_password, hashed_password)
+    except HashingBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e), headers={"Retry-After": str(e.retry_after)})
+
+def daily_macros_from_totals(date: str, totals: Optional[dict]) -> DailyMacros:
+    """DailyMacros for a date from a daily rollup (None means no meals logged)"""
+    totals = totals or {}
+    return DailyMacros(
+        date=date,
+        # Rollups accumulate float increments; round away drift before truncating
+        total_calories=int(round(totals.get('total_calories', 0), 6)),
+        total_protein=round(totals.get('total_protein', 0.0), 1),
+        total_carbs=round(totals.get('total_carbs', 0.0), 1),
+        total_fat=round(totals.get('total_fat', 0.0), 1),
+        meal_count=totals.get('meal_count', 0)
+    )
+
+# Fields sent back for meal and favorite lists; documents are already in MealLog/FavoriteFood
+# shape, so they are returned as-is instead of being rebuilt and validated per item
+MEAL_PROJECTION = {
+    "user_id": 1, "food_name": 1, "dining_location": 1, "meal_type": 1, "portion_size": 1,
+    "calories": 1, "protein": 1, "carbs": 1, "fat": 1, "date": 1, "logged_at": 1
+}
+FAVORITE_PROJECTION = {
+    "user_id": 1, "name": 1, "dining_location": 1, "meal_type": 1, "calories": 1,
+    "protein": 1, "carbs": 1, "fat": 1, "is_custom": 1, "created_at": 1
+}
+
+async def load_meals(user_id: str, date: str) -> List[dict]:
+    """Meals a user logged on a date, as plain documents ready for JSON encoding"""
+    meals = await db.meal_logs.find({"user_id": user_id, "date": date}, MEAL_PROJECTION).to_list(length=None)
+    
+    # Ensure the ID is properly mapped from MongoDB _id
+    for meal in meals:
+        meal['id'] = str(meal.pop('_id'))
+    
+    return meals
+
+async def iter_meal_batches(user_id: str, start: str, end: str, batch_size: int = 500) -> AsyncIterator[List[dict]]:
+    """Meals logged between two dates (inclusive) in date order, read from the cursor in batches"""
+    cursor = db.meal_logs.find(
+        {"user_id": user_id, "date": {"$gte": start, "$lte": end}}, MEAL_PROJECTION
+    ).sort("date", 1).batch_size(batch_size)
+    while True:
+        meals = await cursor.to_list(length=batch_size)
+        if not meals:
+            break
+        for meal in meals:
+            meal['id'] = str(meal.pop('_id'))
+        yield meals
+
+async def load_favorites(user_id: str) -> List[dict]:
+    """All favorite foods of a user, as plain documents ready for JSON encoding"""
+    favorites = await db.favorites.find({"user_id": user_id}, FAVORITE_PROJECTION).to_list(length=None)
+    
+    # Favorites are addressed by their MongoDB _id
+    for favorite in favorites:
+        favorite['id'] = str(favorite.pop('_id'))
+    
+    return favorites
+
+async def load_meal_history(user_id: str, days: int) -> Dict[str, DailyMacros]:
+    """DailyMacros for each of the last `days` days including today, keyed by date"""
+    # Get current date in local timezone to match frontend
+    end_date = datetime.now()
+    # Calculate start date to include exactly 'days' number of days including today
+    # We want days-1 because we're including today as one of the days
+    start_date = end_date.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days-1)
+    
+    date_range = []
+    current = start_date
+    while current <= end_date:
+        date_range.append(current.strftime('%Y-%m-%d'))
+        current += timedelta(days=1)
+    
+    # Ensure we have exactly the right number of dates
+    if len(date_range) != days:
+        logger.warning(f"Expected {days} dates but got {len(date_range)} dates")
+        logger.warning(f"Date range: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
+    # One rollup document per logged day, maintained on every meal write
+    rollups = await get_rollups(db, user_id, date_range[0], date_range[-1])
+    
+    daily_macros = {}
+    for date in date_range:
+        daily_macros[date] = daily_macros_from_totals(date, rollups.get(date))
+    
+    # Log the date range for debugging
+    logger.info(f"History date range: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
+    logger.info(f"Generated dates: {date_range}")
+    logger.info(f"Total meals found: {sum(rollup['meal_count'] for rollup in rollups.values())}")
+    
+    # Log today's date and check if it's in the range
+    today_str = datetime.now().strftime('%Y-%m-%d')
+    logger.info(f"Today's date: {today_str}")
+    logger.info(f"Today in date range: {today_str in date_range}")
+    
+    # Log the final daily_macros keys to see what dates we're returning
+    logger.info(f"Daily macros dates: {list(daily_macros.keys())}")
+    
+    return daily_macros
 
-def verify_password(plain_password: str, hashed_password: str) -> bool:
-    return pwd_context.verify(plain_password, hashed_password)
+def macros_from_meals(date: str, meals: List[dict]) -> DailyMacros:
+    """DailyMacros for a date computed from its already loaded meals"""
+    totals = {'meal_count': len(meals)}
+    for field in ('calories', 'protein', 'carbs', 'fat'):
+        totals[f'total_{field}'] = sum(meal[field] * meal['portion_size'] for meal in meals)
+    return daily_macros_from_totals(date, totals)
 
 def create_access_token(data: dict):
     to_encode = data.copy()
@@ -148,12 +315,59 @@ async def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(s
     except JWTError:
         raise credentials_exception
     
+    cached_user = user_cache.get(user_id)
+    if cached_user is not None:
+        return cached_user
+    
     user = await db.users.find_one({"id": user_id})
     if user is None:
         raise credentials_exception
-    return User(**user)
+    user_obj = User(**user)
+    user_cache.set(user_id, user_obj)
+    return user_obj
 
 
+async def get_optional_user(credentials: Optional[HTTPAuthorizationCredentials] = Depends(optional_security)):
+    """The signed-in user, or None for anonymous or invalid credentials"""
+    if credentials is None:
+        return None
+    try:
+        return await get_current_user(credentials)
+    except HTTPException:
+        return None
+
+async def require_admin(x_admin_token: Optional[str] = Header(None)):
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Admin API is disabled")
+    if x_admin_token != ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Invalid admin token")
+
+# Map frontend location names to scraper location keys
+LOCATION_MAPPING = {
+    'berkshire': 'berkshire',
+    'franklin': 'franklin', 
+    'worcester': 'worcester',
+    'hampshire': 'hampshire',
+    'peoples organic coffee': 'peoples_organic_coffee',
+    'harvest market': 'harvest_market',
+    'harvest': 'harvest',
+    'tavola': 'tavola',
+    'yum bakery': 'yum_bakery',
+    'green fields': 'green_fields',
+    'tamales': 'tamales',
+    'wasabi': 'wasabi',
+    'deli delish': 'deli_delish',
+    'star ginger': 'star_ginger',
+    'grill': 'grill'
+}
+
+def resolve_location_key(location: str) -> Optional[str]:
+    """Scraper location key for a frontend location name, if one matches"""
+    if location:
+        for key, value in LOCATION_MAPPING.items():
+            if key in location.lower():
+                return value
+    return None
 
 # Auth endpoints
 @api_router.post("/register", response_model=Token)
@@ -164,12 +378,16 @@ async def register(user_data: UserCreate):
         raise HTTPException(status_code=400, detail="Email already registered")
     
     # Create user
-    hashed_password = hash_password(user_data.password)
+    hashed_password = await hash_password(user_data.password)
     user = User(username=user_data.username, email=user_data.email)
     user_dict = user.dict()
     user_dict['password_hash'] = hashed_password
     
-    await db.users.insert_one(user_dict)
+    try:
+        await db.users.insert_one(user_dict)
+    except DuplicateKeyError:
+        # A concurrent registration with the same email won the race (email_unique index)
+        raise HTTPException(status_code=400, detail="Email already registered")
     
     # Create token
     access_token = create_access_token(data={"sub": user.id})
@@ -178,59 +396,87 @@ async def register(user_data: UserCreate):
 @api_router.post("/login", response_model=Token)
 async def login(user_data: UserLogin):
     user = await db.users.find_one({"email": user_data.email})
-    if not user or not verify_password(user_data.password, user['password_hash']):
+    if not user or not await verify_password(user_data.password, user['password_hash']):
         raise HTTPException(status_code=401, detail="Invalid credentials")
     
     user_obj = User(**user)
     access_token = create_access_token(data={"sub": user_obj.id})
     return Token(access_token=access_token, token_type="bearer", user=user_obj)
 
+@api_router.get("/auth/stats", dependencies=[Depends(require_admin)])
+async def get_auth_stats():
+    """Password hashing pool and per-user cache statistics"""
+    return {
+        "hashing": password_hasher.stats(),
+        "user_cache": user_cache.stats(),
+        "food_history_cache": food_history_cache.stats()
+    }
+
 @api_router.get("/me", response_model=User)
 async def get_me(current_user: User = Depends(get_current_user)):
     return current_user
 
 # Food endpoints
+async def get_user_food_history(user_id: str):
+    """How often a user logged each food (by canonical name) and each location, over recent logs"""
+    cached = food_history_cache.get(user_id)
+    if cached is not None:
+        return cached
+    
+    history = await db.meal_logs.aggregate([
+        {"$match": {"user_id": user_id}},
+        {"$sort": {"logged_at": -1}},
+        {"$limit": SEARCH_HISTORY_LIMIT},
+        {"$group": {"_id": {"food_name": "$food_name", "dining_location": "$dining_location"}, "count": {"$sum": 1}}}
+    ]).to_list(length=None)
+    
+    foods, locations = Counter(), Counter()
+    for entry in history:
+        foods[name_key(entry['_id'].get('food_name') or '')] += entry['count']
+        dining_location = entry['_id'].get('dining_location') or ''
+        locations[dining_location.lower().replace(' ', '_')] += entry['count']
+    food_history_cache.set(user_id, (foods, locations))
+    return foods, locations
+
 @api_router.get("/food/search")
-async def search_food(q: str = "", location: str = ""):
-    """Search for food items using the nutrition scraper for real data"""
+async def search_food(response: Response, q: str = "", location: str = "", fuzzy: bool = False,
+                      prefer: str = "", offset: int = Query(0, ge=0), limit: int = Query(50, ge=1, le=100),
+                      current_user: Optional[User] = Depends(get_optional_user)):
+    """Search for food items in the latest menu snapshots
+
+    Results are ranked by match quality (exact, prefix, substring), a preferred location
+    (`prefer`, or the signed-in user's most logged location) and the user's logging
+    history, then paginated with `offset`/`limit`. X-Total-Count and X-Next-Offset
+    headers describe the remaining pages. With fuzzy=true, names are matched by trigram
+    similarity, tolerating typos such as "chiken parm".
+    """
     try:
         if not q.strip():
             return []
         
-        # Map frontend location names to scraper location keys
-        location_mapping = {
-            'berkshire': 'berkshire',
-            'franklin': 'franklin', 
-            'worcester': 'worcester',
-            'hampshire': 'hampshire',
-            'peoples organic coffee': 'peoples_organic_coffee',
-            'harvest market': 'harvest_market',
-            'harvest': 'harvest',
-            'tavola': 'tavola',
-            'yum bakery': 'yum_bakery',
-            'green fields': 'green_fields',
-            'tamales': 'tamales',
-            'wasabi': 'wasabi',
-            'deli delish': 'deli_delish',
-            'star ginger': 'star_ginger',
-            'grill': 'grill'
-        }
+        location_key = resolve_location_key(location)
+        preferred_location = resolve_location_key(prefer)
+        
+        foods, locations = Counter(), Counter()
+        if current_user:
+            foods, locations = await get_user_food_history(current_user.id)
+            if not preferred_location and locations:
+                preferred_location = locations.most_common(1)[0][0]
+        
+        def boost(item_location: str, item_key: str) -> float:
+            score = 0.0
+            if preferred_location and item_location == preferred_location:
+                score += 0.2
+            if foods:
+                score += 0.3 * min(foods.get(item_key, 0), 10) / 10
+            return score
         
-        # Find the matching location key
-        location_key = None
-        if location:
-            for key, value in location_mapping.items():
-                if key in location.lower():
-                    location_key = value
-                    break
+        # Search the menu snapshots (a specific location, or all locations)
+        nutrition_items, total = menu_store.search_page(q, location_key, fuzzy, offset, limit, boost)
         
-        # Search for nutrition data
-        if location_key:
-            # Search in specific location
-            nutrition_items = nutrition_scraper.search_food_nutrition(q, location_key)
-        else:
-            # Search in all locations
-            nutrition_items = nutrition_scraper.search_food_nutrition(q)
+        response.headers["X-Total-Count"] = str(total)
+        if offset + limit < total:
+            response.headers["X-Next-Offset"] = str(offset + limit)
         
         # Convert to the expected format
         results = []
@@ -245,36 +491,58 @@ async def search_food(q: str = "", location: str = ""):
                 'fat': item.total_fat or 0.0
             })
         
-        return results[:50]  # Limit results
+        return results
     except Exception as e:
         logging.error(f"Error searching food data: {e}")
         raise HTTPException(status_code=500, detail=f"Error searching food data: {str(e)}")
 
+@api_router.get("/food/suggest")
+async def suggest_food(prefix: str = "", limit: int = Query(8, ge=1, le=20), location: str = ""):
+    """Typeahead food name suggestions, most frequently logged first"""
+    if not prefix.strip():
+        return []
+    return menu_store.suggest(prefix, limit, resolve_location_key(location))
+
+async def fetch_dining_locations():
+    """Location info from the dining site, in the shape the frontend expects"""
+    response = await blocking_runner.run(
+        "dining_locations", requests.get, "https://www.umassdining.com/uapp/get_infov2", timeout=10
+    )
+    response.raise_for_status()
+    dining_data = response.json()
+    
+    locations = []
+    for location_data in dining_data:
+        locations.append({
+            'name': location_data.get('location_title', ''),
+            'description': location_data.get('short_description_v2', ''),
+            'hours': location_data.get('opening_hours', '') + ' - ' + location_data.get('closing_hours', ''),
+            'is_open': location_data.get('opening_hours') != 'Closed'
+        })
+    
+    return locations
+
+# Served from the last good copy; refreshed in the background every TTL
+dining_locations_cache = StaleWhileRevalidateCache("dining locations", fetch_dining_locations, ttl=60)
+
 @api_router.get("/food/locations")
 async def get_dining_locations():
     try:
-        response = requests.get("https://www.umassdining.com/uapp/get_infov2", timeout=10)
-        dining_data = response.json()
-        
-        locations = []
-        for location_data in dining_data:
-            locations.append({
-                'name': location_data.get('location_title', ''),
-                'description': location_data.get('short_description_v2', ''),
-                'hours': location_data.get('opening_hours', '') + ' - ' + location_data.get('closing_hours', ''),
-                'is_open': location_data.get('opening_hours') != 'Closed'
-            })
-        
-        return locations
+        return await dining_locations_cache.get()
+    except RunnerBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error fetching locations: {str(e)}")
 
 # New nutrition scraping endpoints
 @api_router.get("/nutrition/scrape/{location}")
 async def scrape_location_nutrition(location: str):
-    """Scrape nutrition data from a specific dining location"""
+    """Nutrition data for a specific dining location, from its latest menu snapshot"""
     try:
-        nutrition_data = nutrition_scraper.scrape_location(location)
+        location_key = location.lower().replace(' ', '_')
+        if location_key not in nutrition_scraper.get_available_locations():
+            raise ValueError(f"Unknown location: {location}. Available locations: {nutrition_scraper.get_available_locations()}")
+        nutrition_data = menu_store.get_items(location_key)
         return {
             "location": location,
             "items_count": len(nutrition_data),
@@ -287,9 +555,10 @@ async def scrape_location_nutrition(location: str):
 
 @api_router.get("/nutrition/search")
 async def search_nutrition(food_name: str, location: str = None):
-    """Search for nutrition data for a specific food item"""
+    """Search for nutrition data for a specific food item in the menu snapshots"""
     try:
-        nutrition_items = nutrition_scraper.search_food_nutrition(food_name, location)
+        location_key = location.lower().replace(' ', '_') if location else None
+        nutrition_items = menu_store.search(food_name, location_key)
         return {
             "food_name": food_name,
             "location": location,
@@ -311,13 +580,49 @@ async def get_nutrition_locations():
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Error getting nutrition locations: {str(e)}")
 
+@api_router.get("/nutrition/stats", dependencies=[Depends(require_admin)])
+async def get_nutrition_stats():
+    """Upstream load, executor and menu snapshot statistics"""
+    return {
+        "scraper": nutrition_scraper.stats(),
+        "executor": blocking_runner.stats(),
+        "snapshots": menu_store.status(),
+        "scheduler": menu_scheduler.status(),
+        "dining_locations_cache": dining_locations_cache.stats()
+    }
+
+@api_router.post("/nutrition/cache/invalidate", dependencies=[Depends(require_admin)])
+async def invalidate_nutrition_cache(location: Optional[str] = None):
+    """Drop cached menus and re-fetch the served snapshot for one location, or for every location
+    
+    A single location is refreshed before responding; all locations refresh in the background.
+    """
+    if not location:
+        removed = nutrition_scraper.invalidate()
+        return {"location": None, "entries_removed": removed, "refresh_started": menu_scheduler.trigger()}
+    
+    location_key = location.lower().replace(' ', '_')
+    if location_key not in nutrition_scraper.get_available_locations():
+        raise HTTPException(status_code=400, detail=f"Unknown location: {location}")
+    removed = nutrition_scraper.invalidate(location_key)
+    try:
+        items = await menu_store.refresh_location(location_key)
+    except RunnerBusyError as e:
+        raise HTTPException(status_code=503, detail=str(e))
+    except Exception as e:
+        logger.error(f"Error refreshing {location_key} after invalidation: {e}")
+        raise HTTPException(status_code=502, detail=f"Error refreshing {location_key}: {str(e)}")
+    return {"location": location_key, "entries_removed": removed, "items": len(items)}
+
 @api_router.post("/nutrition/scrape-all")
 async def scrape_all_locations():
-    """Scrape nutrition data from all available locations"""
+    """Start a background refresh of all locations and return the current snapshots"""
     try:
-        all_data = nutrition_scraper.scrape_all_locations()
+        refresh_started = menu_scheduler.trigger()
+        all_data = {location: menu_store.get_items(location) for location in nutrition_scraper.get_available_locations()}
         total_items = sum(len(items) for items in all_data.values())
         return {
+            "refresh_started": refresh_started,
             "locations_scraped": len(all_data),
             "total_items": total_items,
             "data": all_data
@@ -334,54 +639,68 @@ async def log_meal(meal_data: MealLogCreate, current_user: User = Depends(get_cu
     )
     
     meal_dict = meal_log.dict()
-    meal_dict['logged_at'] = meal_dict['logged_at'].isoformat()
     
     # Ensure the ID is properly set
     meal_dict['_id'] = meal_dict['id']
     
     await db.meal_logs.insert_one(meal_dict)
+    await add_meal(db, meal_dict)
+    food_history_cache.invalidate(current_user.id)
     return meal_log
 
 @api_router.get("/meals/today", response_model=List[MealLog])
 async def get_today_meals(current_user: User = Depends(get_current_user)):
     today = datetime.now().strftime('%Y-%m-%d')
-    meals = await db.meal_logs.find({"user_id": current_user.id, "date": today}).to_list(length=None)
-    
-    for meal in meals:
-        if isinstance(meal.get('logged_at'), str):
-            meal['logged_at'] = datetime.fromisoformat(meal['logged_at'])
-        # Ensure the ID is properly mapped from MongoDB _id
-        if '_id' in meal:
-            meal['id'] = str(meal['_id'])
-    
-    return [MealLog(**meal) for meal in meals]
+    # Returning the response directly skips re-validating every meal against response_model
+    return ORJSONResponse(await load_meals(current_user.id, today))
 
 @api_router.get("/meals/date/{date}", response_model=List[MealLog])
 async def get_meals_by_date(date: str, current_user: User = Depends(get_current_user)):
     """Get meals for a specific date"""
-    meals = await db.meal_logs.find({"user_id": current_user.id, "date": date}).to_list(length=None)
+    return ORJSONResponse(await load_meals(current_user.id, date))
+
+@api_router.get("/meals/range", response_model=List[MealLog])
+async def get_meals_in_range(
+    start: str = Query(..., description="First date (YYYY-MM-DD)"),
+    end: str = Query(..., description="Last date (YYYY-MM-DD), inclusive"),
+    output: str = Query("json", alias="format", pattern="^(json|ndjson)$"),
+    current_user: User = Depends(get_current_user)
+):
+    """Stream meals logged between two dates as a JSON array or NDJSON (one meal per line)"""
+    try:
+        first, last = datetime.strptime(start, '%Y-%m-%d'), datetime.strptime(end, '%Y-%m-%d')
+    except ValueError:
+        raise HTTPException(status_code=400, detail="Dates must be in YYYY-MM-DD format")
+    if first > last:
+        raise HTTPException(status_code=400, detail="start must not be after end")
     
-    for meal in meals:
-        if isinstance(meal.get('logged_at'), str):
-            meal['logged_at'] = datetime.fromisoformat(meal['logged_at'])
-        # Ensure the ID is properly mapped from MongoDB _id
-        if '_id' in meal:
-            meal['id'] = str(meal['_id'])
+    # Only one batch of meals is held in memory at a time, however long the window. Dates are
+    # re-formatted so unpadded input (2026-1-5) compares correctly against stored YYYY-MM-DD strings
+    batches = iter_meal_batches(current_user.id, first.strftime('%Y-%m-%d'), last.strftime('%Y-%m-%d'))
     
-    return [MealLog(**meal) for meal in meals]
+    if output == "ndjson":
+        async def ndjson():
+            async for meals in batches:
+                yield b''.join(orjson.dumps(meal) + b'\n' for meal in meals)
+        return StreamingResponse(ndjson(), media_type="application/x-ndjson")
+    
+    async def json_array():
+        separator = b'['
+        async for meals in batches:
+            yield separator + b','.join(orjson.dumps(meal) for meal in meals)
+            separator = b','
+        yield b']' if separator == b',' else b'[]'
+    return StreamingResponse(json_array(), media_type="application/json")
 
 @api_router.delete("/meals/{meal_id}")
 async def delete_meal(meal_id: str, current_user: User = Depends(get_current_user)):
-    # Find the meal and verify ownership
-    meal = await db.meal_logs.find_one({"_id": meal_id, "user_id": current_user.id})
+    # Delete the meal, verifying ownership, and get it back to update the day's rollup
+    meal = await db.meal_logs.find_one_and_delete({"_id": meal_id, "user_id": current_user.id})
     if not meal:
         raise HTTPException(status_code=404, detail="Meal not found or access denied")
     
-    # Delete the meal
-    result = await db.meal_logs.delete_one({"_id": meal_id, "user_id": current_user.id})
-    if result.deleted_count == 0:
-        raise HTTPException(status_code=404, detail="Meal not found")
-    
+    await remove_meal(db, meal)
+    food_history_cache.invalidate(current_user.id)
     return {"message": "Meal deleted successfully"}
 
 # Favorites endpoints
@@ -413,9 +732,12 @@ async def add_favorite(food_data: dict, current_user: User = Depends(get_current
         
         favorite_dict = favorite.dict()
         favorite_dict['_id'] = ObjectId()  # Generate new ObjectId
-        favorite_dict['created_at'] = favorite_dict['created_at'].isoformat()
         
-        await db.favorites.insert_one(favorite_dict)
+        try:
+            await db.favorites.insert_one(favorite_dict)
+        except DuplicateKeyError:
+            # A concurrent add of the same food won the race (user_name_location_unique index)
+            raise HTTPException(status_code=400, detail="Food item already in favorites")
         return {"message": "Food added to favorites", "favorite": favorite}
         
     except HTTPException:
@@ -428,17 +750,7 @@ async def add_favorite(food_data: dict, current_user: User = Depends(get_current
 async def get_favorites(current_user: User = Depends(get_current_user)):
     """Get all user's favorite foods"""
     try:
-        favorites = await db.favorites.find({"user_id": current_user.id}).to_list(length=None)
-        
-        # Convert MongoDB _id to id and handle datetime
-        for favorite in favorites:
-            if '_id' in favorite:
-                favorite['id'] = str(favorite['_id'])
-                del favorite['_id']  # Remove the MongoDB _id field
-            if isinstance(favorite.get('created_at'), str):
-                favorite['created_at'] = datetime.fromisoformat(favorite['created_at'])
-        
-        return [FavoriteFood(**favorite) for favorite in favorites]
+        return ORJSONResponse(await load_favorites(current_user.id))
         
     except Exception as e:
         logger.error(f"Error fetching favorites: {e}")
@@ -485,78 +797,28 @@ async def check_favorite(food_name: str, current_user: User = Depends(get_curren
         return {"is_favorite": False}
 
 @api_router.get("/meals/history")
-async def get_meal_history(days: int = 14, current_user: User = Depends(get_current_user)):
-    # Get current date in local timezone to match frontend
-    end_date = datetime.now()
-    # Calculate start date to include exactly 'days' number of days including today
-    # We want days-1 because we're including today as one of the days
-    start_date = end_date.replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=days-1)
-    
-    date_range = []
-    current = start_date
-    while current <= end_date:
-        date_range.append(current.strftime('%Y-%m-%d'))
-        current += timedelta(days=1)
-    
-    # Ensure we have exactly the right number of dates
-    if len(date_range) != days:
-        logger.warning(f"Expected {days} dates but got {len(date_range)} dates")
-        logger.warning(f"Date range: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
-    meals = await db.meal_logs.find({
-        "user_id": current_user.id,
-        "date": {"$in": date_range}
-    }).to_list(length=None)
-    
-    # Group by date
-    daily_macros = {}
-    for date in date_range:
-        daily_meals = [m for m in meals if m['date'] == date]
-        total_calories = sum(m['calories'] * m['portion_size'] for m in daily_meals)
-        total_protein = sum(m['protein'] * m['portion_size'] for m in daily_meals)
-        total_carbs = sum(m['carbs'] * m['portion_size'] for m in daily_meals)
-        total_fat = sum(m['fat'] * m['portion_size'] for m in daily_meals)
-        
-        daily_macros[date] = DailyMacros(
-            date=date,
-            total_calories=int(total_calories),
-            total_protein=round(total_protein, 1),
-            total_carbs=round(total_carbs, 1),
-            total_fat=round(total_fat, 1),
-            meal_count=len(daily_meals)
-        )
-    
-    # Log the date range for debugging
-    logger.info(f"History date range: {start_date.strftime('%Y-%m-%d')} to {end_date.strftime('%Y-%m-%d')}")
-    logger.info(f"Generated dates: {date_range}")
-    logger.info(f"Total meals found: {len(meals)}")
-    
-    # Log today's date and check if it's in the range
-    today_str = datetime.now().strftime('%Y-%m-%d')
-    logger.info(f"Today's date: {today_str}")
-    logger.info(f"Today in date range: {today_str in date_range}")
-    
-    # Log the final daily_macros keys to see what dates we're returning
-    logger.info(f"Daily macros dates: {list(daily_macros.keys())}")
-    
-    return daily_macros
+async def get_meal_history(days: int = Query(14, ge=1, le=366), current_user: User = Depends(get_current_user)):
+    return await load_meal_history(current_user.id, days)
 
 @api_router.get("/dashboard/macros/{date}", response_model=DailyMacros)
 async def get_daily_macros(date: str, current_user: User = Depends(get_current_user)):
-    meals = await db.meal_logs.find({"user_id": current_user.id, "date": date}).to_list(length=None)
-    
-    total_calories = sum(m['calories'] * m['portion_size'] for m in meals)
-    total_protein = sum(m['protein'] * m['portion_size'] for m in meals)
-    total_carbs = sum(m['carbs'] * m['portion_size'] for m in meals)
-    total_fat = sum(m['fat'] * m['portion_size'] for m in meals)
-    
-    return DailyMacros(
-        date=date,
-        total_calories=int(total_calories),
-        total_protein=round(total_protein, 1),
-        total_carbs=round(total_carbs, 1),
-        total_fat=round(total_fat, 1),
-        meal_count=len(meals)
+    return daily_macros_from_totals(date, await get_rollup(db, current_user.id, date))
+
+@api_router.get("/dashboard/{date}", response_model=DashboardData)
+async def get_dashboard(date: str, days: int = Query(14, ge=1, le=366), current_user: User = Depends(get_current_user)):
+    """Macros, meals, history and favorites for the dashboard in a single round trip"""
+    meals, history, favorites = await asyncio.gather(
+        load_meals(current_user.id, date),
+        load_meal_history(current_user.id, days),
+        load_favorites(current_user.id),
     )
+    return ORJSONResponse({
+        "date": date,
+        "macros": macros_from_meals(date, meals).dict(),
+        "meals": meals,
+        "history": {day: macros.dict() for day, macros in history.items()},
+        "favorites": favorites,
+    })
 
 # Include the router in the main app
 app.include_router(api_router)
@@ -567,6 +829,7 @@ app.add_middleware(
     allow_origins=os.environ.get('CORS_ORIGINS', '*').split(','),
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Total-Count", "X-Next-Offset"],
 )
 
 # Configure logging
@@ -576,7 +839,20 @@ logging.basicConfig(
 )
 logger = logging.getLogger(__name__)
 
+@app.on_event("startup")
+async def startup():
+    await ensure_indexes(db)
+    await ensure_rollups(db)
+    await menu_store.load()
+    await menu_store.refresh_popularity()
+    menu_scheduler.start()
+    dining_locations_cache.start()
+
 @app.on_event("shutdown")
 async def shutdown_db_client():
+    await menu_scheduler.stop()
+    await dining_locations_cache.stop()
     client.close()
+    blocking_runner.shutdown()
+    password_hasher.shutdown()
     nutrition_scraper.close()
\ No newline at end of file
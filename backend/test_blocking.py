@@ -0,0 +1,43 @@
+#!/usr/bin/env python3
+"""
+Tests for the blocking work runner
+"""
+
+import sys
+import os
+import asyncio
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+from blocking import BlockingRunner, RunnerBusyError
+
+
+def test_keyword_arguments_reach_the_callee():
+    runner = BlockingRunner(max_workers=2)
+
+    def fetch(url, timeout=None):
+        return url, timeout
+
+    try:
+        assert asyncio.run(runner.run("fetch", fetch, "https://example.com", timeout=10)) == ("https://example.com", 10)
+    finally:
+        runner.shutdown()
+
+
+def test_queue_timeout_rejects_when_limit_is_exhausted():
+    runner = BlockingRunner(max_workers=2, limits={"slow": 1})
+    release = threading.Event()
+
+    async def scenario():
+        first = asyncio.create_task(runner.run("slow", release.wait))
+        await asyncio.sleep(0.05)
+        with pytest.raises(RunnerBusyError):
+            await runner.run("slow", release.wait, queue_timeout=0.05)
+        release.set()
+        assert await first is True
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        runner.shutdown()
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Tests for the materialized daily macro rollups, run against mongomock
+"""
+
+import sys
+import os
+import asyncio
+import uuid
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+from mongomock_motor import AsyncMongoMockClient
+
+from daily_rollups import add_meal, get_rollup, get_rollups, rebuild_rollups, remove_meal
+
+
+def meal(user_id: str, date: str, calories: int, protein: float, carbs: float, fat: float, portion_size: float = 1.0):
+    meal_id = str(uuid.uuid4())
+    return {
+        "_id": meal_id, "id": meal_id, "user_id": user_id, "date": date, "portion_size": portion_size,
+        "calories": calories, "protein": protein, "carbs": carbs, "fat": fat,
+    }
+
+
+async def log(db, document):
+    await db.meal_logs.insert_one(document)
+    await add_meal(db, document)
+
+
+async def delete(db, document):
+    await db.meal_logs.delete_one({"_id": document['_id']})
+    await remove_meal(db, document)
+
+
+async def totals_from_meal_logs(db):
+    """Rollups recomputed by hand from the raw meal logs"""
+    totals = {}
+    async for document in db.meal_logs.find():
+        day = totals.setdefault((document['user_id'], document['date']), {
+            "total_calories": 0, "total_protein": 0, "total_carbs": 0, "total_fat": 0, "meal_count": 0,
+        })
+        for field in ("calories", "protein", "carbs", "fat"):
+            day[f"total_{field}"] += document[field] * document['portion_size']
+        day["meal_count"] += 1
+    return totals
+
+
+async def stored_rollups(db):
+    return {
+        (rollup['user_id'], rollup['date']): {key: value for key, value in rollup.items() if key.startswith(("total_", "meal_"))}
+        async for rollup in db.daily_macros.find()
+    }
+
+
+def assert_rollups_match(actual, expected):
+    assert actual.keys() == expected.keys()
+    for key, totals in expected.items():
+        assert actual[key]["meal_count"] == totals["meal_count"]
+        for field, value in totals.items():
+            assert actual[key][field] == pytest.approx(value)
+
+
+def test_rollups_follow_logs_deletes_and_rebuilds():
+    async def scenario():
+        db = AsyncMongoMockClient()["rollups_test"]
+        breakfast = meal("alice", "2024-03-01", 300, 20.5, 30, 10, portion_size=1.5)
+        lunch = meal("alice", "2024-03-01", 650, 40, 70.2, 22)
+        dinner = meal("alice", "2024-03-02", 800, 55, 90, 30, portion_size=0.5)
+        snack = meal("bob", "2024-03-01", 150, 3, 20, 7)
+        for document in (breakfast, lunch, dinner, snack):
+            await log(db, document)
+
+        assert_rollups_match(await stored_rollups(db), await totals_from_meal_logs(db))
+        assert (await get_rollup(db, "alice", "2024-03-01"))["meal_count"] == 2
+        assert set(await get_rollups(db, "alice", "2024-03-01", "2024-03-31")) == {"2024-03-01", "2024-03-02"}
+
+        # Deleting the last meal of a day drops that day's rollup
+        await delete(db, lunch)
+        await delete(db, dinner)
+        assert await get_rollup(db, "alice", "2024-03-02") is None
+        assert_rollups_match(await stored_rollups(db), await totals_from_meal_logs(db))
+
+        # Rebuilding from meal_logs (after drift or for existing data) gives the same rollups
+        expected = await stored_rollups(db)
+        await db.daily_macros.update_one({"user_id": "alice"}, {"$inc": {"total_calories": 999}})
+        assert await rebuild_rollups(db) == 2
+        assert_rollups_match(await stored_rollups(db), expected)
+
+        await db.daily_macros.delete_many({})
+        assert await rebuild_rollups(db, "bob") == 1
+        assert set(await stored_rollups(db)) == {("bob", "2024-03-01")}
+
+    asyncio.run(scenario())
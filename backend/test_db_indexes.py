@@ -0,0 +1,45 @@
+#!/usr/bin/env python3
+"""
+Tests for the MongoDB index bootstrap, run against mongomock
+"""
+
+import sys
+import os
+import asyncio
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from mongomock_motor import AsyncMongoMockClient
+
+from db_indexes import INDEXES, ensure_indexes
+
+
+async def index_names(collection):
+    return set(await collection.index_information()) - {"_id_"}
+
+
+def test_ensure_indexes_creates_every_index():
+    async def scenario():
+        db = AsyncMongoMockClient()["indexes_test"]
+        await ensure_indexes(db)
+        for collection, indexes in INDEXES.items():
+            assert await index_names(db[collection]) == {index.document["name"] for index in indexes}
+
+    asyncio.run(scenario())
+
+
+def test_duplicates_only_block_their_own_unique_index():
+    async def scenario():
+        db = AsyncMongoMockClient()["indexes_test"]
+        await db.users.insert_many([
+            {"id": "user-1", "email": "same@example.com"},
+            {"id": "user-2", "email": "same@example.com"},
+        ])
+        favorite = {"user_id": "user-1", "name": "Pizza", "dining_location": "Berkshire"}
+        await db.favorites.insert_many([dict(favorite), dict(favorite)])
+
+        await ensure_indexes(db)
+        assert await index_names(db.users) == {"id_unique"}
+        assert await index_names(db.favorites) == {"user_id"}
+        assert await index_names(db.meal_logs) == {"user_date", "user_logged_at"}
+
+    asyncio.run(scenario())
@@ -0,0 +1,150 @@
+#!/usr/bin/env python3
+"""
+Fixture tests for menu page parsing
+
+Expected items are the output of the original BeautifulSoup strategies
+(_parse_nutrition_table + _parse_nutrition_cards) on the same markup, so the
+parser rewrites are checked against the behavior they replaced.
+"""
+
+import sys
+import os
+from dataclasses import asdict
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+from bs4 import BeautifulSoup
+from nutrition_scraper import UMassNutritionScraper
+
+LIGHTBOX = '''<html><body><div id="content_text"><div id="lunch_menu" class="menu_item"><ul>
+<li class="lightbox-nutrition"><a href="#inline" data-dish-name="Chicken Parmesan" data-serving-size="1 each" data-calories="450" data-total-fat="18g" data-sat-fat="6g" data-trans-fat="0g" data-cholesterol="85mg" data-sodium="920mg" data-total-carb="38g" data-dietary-fiber="3g" data-sugars="6g" data-protein="32g" data-healthfulness="45">Chicken Parmesan</a></li>
+<li class="lightbox-nutrition"><a href="#inline" data-calories="210" data-protein="4.5g" data-total-carb="40g">Jasmine Rice</a></li>
+<li class="lightbox-nutrition"><a href="#inline" data-dish-name="Water" data-serving-size="8 oz">Water</a></li>
+<li class="lightbox-nutrition"><a href="#inline" data-dish-name="Mystery Soup" data-calories="abc" data-total-fat="2.5g">Mystery Soup</a></li>
+<li class="lightbox-nutrition"><a href="#inline" data-dish-name="chicken parmesan" data-calories="999">dup</a></li>
+<li class="lightbox-nutrition"><span>no link</span></li>
+</ul></div></div></body></html>'''.encode('utf-8')
+
+LIGHTBOX_EXPECTED = [
+    {'name': 'Chicken Parmesan', 'serving_size': '1 each', 'calories': 450, 'total_fat': 18.0,
+     'saturated_fat': 6.0, 'trans_fat': 0.0, 'cholesterol': 85.0, 'sodium': 920.0,
+     'total_carbohydrates': 38.0, 'dietary_fiber': 3.0, 'total_sugars': 6.0, 'protein': 32.0},
+    {'name': 'Jasmine Rice', 'calories': 210, 'total_carbohydrates': 40.0, 'protein': 4.5},
+    {'name': 'Mystery Soup', 'total_fat': 2.5},
+]
+
+CARDS = b'''<html><body>
+<article class="dish"><h4 class="dish-title">Veggie Burger</h4><p>380 cal, 20g protein, 12 g fat, 45g carbs</p><p>Serving: 5 oz</p></article>
+<div class="food-card"><span class="food-name">Caesar Salad</span><p>250 Cal | 8 protein | 14g fat</p></div>
+<div class="card"><h3 class="title">Fruit Cup</h3><p>Fresh fruit, 90 cal, 22g carb. Serving size 1 cup</p></div>
+<div class="card"><h3 class="title">Plain Card</h3><p>No nutrition listed</p></div>
+<div class="card"><p>350 cal but no name element</p></div>
+</body></html>'''
+
+CARDS_EXPECTED = [
+    {'name': 'Veggie Burger', 'serving_size': '5 oz', 'calories': 380, 'total_fat': 12.0,
+     'total_carbohydrates': 45.0, 'protein': 20.0},
+    {'name': 'Caesar Salad', 'calories': 250, 'total_fat': 14.0, 'protein': 8.0},
+    {'name': 'Fruit Cup', 'serving_size': '1 cup', 'calories': 90, 'total_carbohydrates': 22.0},
+]
+
+NESTED_CARDS = b'''<html><body><div class="menu-items">
+<div class="food-card"><h3 class="food-name">Chicken Parm</h3><p>450 cal 30g protein</p></div>
+<div class="food-card"><h3 class="food-name">Veggie Burger</h3><p>380 cal 20g protein 12g fat</p></div>
+<div class="food-card"><h3 class="food-name">Caesar Salad</h3><p>250 cal 8g protein 40g carbs</p></div>
+</div></body></html>'''
+
+# The original strategies also returned the wrapper as a bogus item named
+# 'Chicken Parm450 cal 30g protein'; only the real cards are expected now
+NESTED_CARDS_EXPECTED = [
+    {'name': 'Chicken Parm', 'calories': 450, 'protein': 30.0},
+    {'name': 'Veggie Burger', 'calories': 380, 'total_fat': 12.0, 'protein': 20.0},
+    {'name': 'Caesar Salad', 'calories': 250, 'total_carbohydrates': 40.0, 'protein': 8.0},
+]
+
+# Name elements such as div.item-name also match the card classes; the card around
+# them is still the item
+NAME_DIV_CARD_MARKUP = b'''
+<div class="menu-item"><div class="item-name">Chicken Parm</div><span>450 cal</span></div>
+<article class="food-card"><div class="food-title">Veggie Burger</div><p>380 cal 20g protein</p></article>
+<div class="card"><h3 class="dish-name">Pasta</h3><p>520 cal 18g protein 75g carbs</p></div>
+'''
+NAME_DIV_CARDS = b'<html><body>' + NAME_DIV_CARD_MARKUP + b'</body></html>'
+
+NAME_DIV_CARDS_EXPECTED = [
+    {'name': 'Chicken Parm', 'calories': 450},
+    {'name': 'Veggie Burger', 'calories': 380, 'protein': 20.0},
+    {'name': 'Pasta', 'calories': 520, 'total_carbohydrates': 75.0, 'protein': 18.0},
+]
+
+
+@pytest.fixture
+def scraper():
+    scraper = UMassNutritionScraper()
+    yield scraper
+    scraper.close()
+
+
+def set_fields(item) -> dict:
+    return {key: value for key, value in asdict(item).items() if value is not None}
+
+
+def parsed(scraper: UMassNutritionScraper, content: bytes):
+    """Parsed items as dicts of their set fields, without the location info added by the parser"""
+    items = []
+    for item in scraper._parse_menu_page(content, 'berkshire'):
+        values = set_fields(item)
+        assert values.pop('dining_location') == 'Berkshire'
+        assert values.pop('meal_type') == 'Lunch'
+        items.append(values)
+    return items
+
+
+def parsed_tree(scraper: UMassNutritionScraper, content: bytes):
+    """Unique items from the single-pass BeautifulSoup fallback, first occurrence wins"""
+    items = {}
+    for item in scraper._parse_menu_tree(BeautifulSoup(content, 'html.parser')):
+        items.setdefault(item.name.lower(), set_fields(item))
+    return list(items.values())
+
+
+def test_lightbox_items_fast_path(scraper):
+    assert parsed(scraper, LIGHTBOX) == LIGHTBOX_EXPECTED
+
+
+def test_lightbox_items_fallback_tree(scraper):
+    assert parsed_tree(scraper, LIGHTBOX) == LIGHTBOX_EXPECTED
+
+
+def test_card_layout(scraper):
+    assert parsed(scraper, CARDS) == CARDS_EXPECTED
+    assert parsed_tree(scraper, CARDS) == CARDS_EXPECTED
+
+
+def test_nested_cards_parse_innermost_cards(scraper):
+    assert parsed(scraper, NESTED_CARDS) == NESTED_CARDS_EXPECTED
+
+
+def test_cards_with_name_divs(scraper):
+    assert parsed(scraper, NAME_DIV_CARDS) == NAME_DIV_CARDS_EXPECTED
+
+
+def test_nested_cards_with_name_divs(scraper):
+    page = b'<html><body><div class="menu-items">' + NAME_DIV_CARD_MARKUP + b'</div></body></html>'
+    assert parsed(scraper, page) == NAME_DIV_CARDS_EXPECTED
+
+
+def lightbox_page(name: str, head: str = '') -> str:
+    return (f'<html><head>{head}</head><body><ul><li class="lightbox-nutrition">'
+            f'<a href="#inline" data-dish-name="{name}" data-calories="300">{name}</a></li></ul></body></html>')
+
+
+@pytest.mark.parametrize("content, encoding", [
+    (lightbox_page('Jalapeño Poppers').encode('utf-8'), None),
+    (lightbox_page('Jalapeño Poppers').encode('utf-8'), 'utf-8'),
+    (lightbox_page('Jalapeño Poppers').encode('latin-1'), 'ISO-8859-1'),
+    (lightbox_page('Jalapeño Poppers', '<meta charset="iso-8859-1">').encode('latin-1'), None),
+])
+def test_page_encoding(scraper, content, encoding):
+    items = scraper._parse_menu_page(content, 'berkshire', encoding)
+    assert [item.name for item in items] == ['Jalapeño Poppers']
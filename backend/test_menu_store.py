@@ -0,0 +1,56 @@
+#!/usr/bin/env python3
+"""
+Tests for the persisted menu snapshot store, run against mongomock
+"""
+
+import sys
+import os
+import asyncio
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+from mongomock_motor import AsyncMongoMockClient
+
+import menu_store
+from blocking import BlockingRunner
+from menu_store import MenuSnapshotStore
+from nutrition_scraper import NutritionData
+
+
+class StubScraper:
+    """Scraper returning a fixed menu per location"""
+
+    def __init__(self, menus):
+        self.menus = menus
+
+    def scrape_location(self, location, use_cache=True):
+        return [NutritionData(name=name, calories=100) for name in self.menus[location]]
+
+    def get_available_locations(self):
+        return list(self.menus)
+
+
+def test_refresh_keeps_only_the_latest_snapshot(monkeypatch):
+    async def scenario():
+        db = AsyncMongoMockClient()["menu_store_test"]
+        runner = BlockingRunner(max_workers=2)
+        scraper = StubScraper({"berkshire": ["Chicken Parmesan"], "worcester": ["Grilled Chicken"]})
+        store = MenuSnapshotStore(db, scraper, runner=runner)
+        try:
+            for menu_date in ("2024-03-01", "2024-03-02"):
+                monkeypatch.setattr(menu_store, "current_menu_date", lambda: menu_date)
+                assert await store.refresh_all() == {"berkshire": 1, "worcester": 1}
+            # A second refresh on the same date replaces that date's snapshot
+            scraper.menus["berkshire"] = ["Eggplant Parmesan", "Pasta"]
+            await store.refresh_location("berkshire")
+
+            docs = await db.menu_items.find().to_list(length=None)
+            assert {doc["menu_date"] for doc in docs} == {"2024-03-02"}
+            assert sorted(doc["name"] for doc in docs) == ["Eggplant Parmesan", "Grilled Chicken", "Pasta"]
+
+            restarted = MenuSnapshotStore(db, scraper, runner=runner)
+            await restarted.load("2024-03-02")
+            assert [item.name for item in restarted.search("parm")] == ["Eggplant Parmesan"]
+        finally:
+            runner.shutdown()
+
+    asyncio.run(scenario())
@@ -0,0 +1,57 @@
+#!/usr/bin/env python3
+"""
+Tests for the bcrypt worker pool's backpressure
+"""
+
+import sys
+import os
+import asyncio
+import threading
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+from password_hashing import HashingBusyError, PasswordHasher
+
+
+class BlockingContext:
+    """CryptContext stand-in whose calls wait until released"""
+
+    def __init__(self):
+        self.release = threading.Event()
+
+    def hash(self, password):
+        self.release.wait(5)
+        return f"hashed:{password}"
+
+    def verify(self, plain_password, hashed_password):
+        self.release.wait(5)
+        return hashed_password == f"hashed:{plain_password}"
+
+
+def test_rejects_calls_past_workers_plus_queue():
+    context = BlockingContext()
+    hasher = PasswordHasher(context, max_workers=2, max_queue=1, retry_after=3)
+
+    async def scenario():
+        accepted = [asyncio.create_task(hasher.hash(f"password{n}")) for n in range(3)]
+        await asyncio.sleep(0.01)
+        assert hasher.stats()["pending"] == 3
+
+        with pytest.raises(HashingBusyError) as busy:
+            await hasher.verify("password0", "hashed:password0")
+        assert busy.value.retry_after == 3
+
+        context.release.set()
+        assert await asyncio.gather(*accepted) == ["hashed:password0", "hashed:password1", "hashed:password2"]
+        # Capacity frees up once the queue drains
+        assert await hasher.verify("password0", "hashed:password0") is True
+
+    try:
+        asyncio.run(scenario())
+    finally:
+        hasher.shutdown()
+
+    stats = hasher.stats()
+    assert stats["rejected"] == 1
+    assert stats["completed"] == 4
+    assert stats["pending"] == 0
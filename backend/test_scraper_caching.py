@@ -0,0 +1,292 @@
+#!/usr/bin/env python3
+"""
+Tests for the scraper's upstream load controls, with a stubbed HTTP session
+"""
+
+import sys
+import os
+import threading
+import time
+from datetime import datetime
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+import requests
+from requests.structures import CaseInsensitiveDict
+
+import nutrition_scraper
+from nutrition_scraper import DINING_TZ, MenuCache, NutritionData, SingleFlight, UMassNutritionScraper, estimate_size
+
+
+def menu_page(*names: str) -> bytes:
+    items = ''.join(
+        f'<li class="lightbox-nutrition"><a href="#inline" data-dish-name="{name}" data-calories="300">{name}</a></li>'
+        for name in names
+    )
+    return f'<html><body><ul>{items}</ul></body></html>'.encode('utf-8')
+
+
+def response(url: str, status_code: int = 200, content: bytes = b'', headers: dict = None) -> requests.Response:
+    result = requests.Response()
+    result.url = url
+    result.status_code = status_code
+    result._content = content
+    result.headers = CaseInsensitiveDict({'Content-Type': 'text/html; charset=utf-8', **(headers or {})})
+    result.encoding = 'utf-8'
+    return result
+
+
+class StubSession:
+    """Stands in for requests.Session, recording the headers of every GET"""
+
+    def __init__(self, respond):
+        self.respond = respond
+        self.requests = []
+        self._lock = threading.Lock()
+
+    def get(self, url, headers=None, timeout=None):
+        with self._lock:
+            self.requests.append((url, dict(headers or {})))
+        return self.respond(url, headers or {})
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Settable current time for the scraper module, given in Amherst time"""
+    class Clock:
+        now = datetime(2024, 3, 4, 10, 30, tzinfo=DINING_TZ)
+
+        def set(self, hour, minute=0, day=4):
+            self.now = datetime(2024, 3, day, hour, minute, tzinfo=DINING_TZ)
+
+    current = Clock()
+
+    class FrozenDatetime(datetime):
+        @classmethod
+        def now(cls, tz=None):
+            return current.now.astimezone(tz)
+
+    monkeypatch.setattr(nutrition_scraper, 'datetime', FrozenDatetime)
+    return current
+
+
+@pytest.fixture
+def scraper():
+    scraper = UMassNutritionScraper(requests_per_second=1000)
+    yield scraper
+    scraper.close()
+
+
+def test_single_flight_coalesces_concurrent_scrapes(scraper):
+    release = threading.Event()
+
+    def respond(url, headers):
+        release.wait(5)
+        return response(url, content=menu_page('Chicken Parmesan'))
+
+    scraper.session = StubSession(respond)
+    results = []
+    threads = [
+        threading.Thread(target=lambda: results.append(scraper.scrape_location('berkshire')))
+        for _ in range(5)
+    ]
+    for thread in threads:
+        thread.start()
+    deadline = time.monotonic() + 5
+    while scraper.stats()['single_flight']['coalesced'] < 4 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(scraper.session.requests) == 1
+    assert [[item.name for item in items] for items in results] == [['Chicken Parmesan']] * 5
+    # Every caller gets its own list
+    assert len({id(items) for items in results}) == 5
+    assert scraper.stats()['single_flight'] == {"executions": 1, "coalesced": 4, "in_flight": 0}
+
+
+def test_single_flight_shares_errors_and_forgets_finished_calls():
+    flight = SingleFlight()
+    started, release = threading.Event(), threading.Event()
+    calls = []
+
+    def fail():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        raise RuntimeError("upstream down")
+
+    errors = []
+
+    def call():
+        try:
+            flight.do('berkshire', fail)
+        except RuntimeError as e:
+            errors.append(str(e))
+
+    leader = threading.Thread(target=call)
+    leader.start()
+    started.wait(5)
+    follower = threading.Thread(target=call)
+    follower.start()
+    deadline = time.monotonic() + 5
+    while flight.stats()['coalesced'] < 1 and time.monotonic() < deadline:
+        time.sleep(0.01)
+    release.set()
+    leader.join()
+    follower.join()
+
+    assert errors == ["upstream down"] * 2
+    assert len(calls) == 1
+    # A finished call is not reused
+    assert flight.do('berkshire', lambda: 'fresh') == 'fresh'
+    assert flight.stats() == {"executions": 2, "coalesced": 1, "in_flight": 0}
+
+
+def menu(*names: str):
+    return [NutritionData(name=name, calories=300) for name in names]
+
+
+def test_cache_expires_at_the_next_meal_period(clock):
+    cache = MenuCache(ttl=12 * 60 * 60)
+    cache.set(('berkshire', '2024-03-04'), menu('Pancakes'))
+
+    clock.set(10, 59)
+    assert [item.name for item in cache.get(('berkshire', '2024-03-04'))] == ['Pancakes']
+    # Lunch starts at 11:00
+    clock.set(11, 0)
+    assert cache.get(('berkshire', '2024-03-04')) is None
+
+    # Late night entries last until breakfast the next morning
+    clock.set(22, 0)
+    cache.set(('berkshire', '2024-03-04'), menu('Pizza'))
+    clock.set(6, 59, day=5)
+    assert cache.get(('berkshire', '2024-03-04')) is not None
+    clock.set(7, 0, day=5)
+    assert cache.get(('berkshire', '2024-03-04')) is None
+    assert cache.stats()['entries'] == 0
+
+
+def test_cache_ttl_caps_expiry(clock):
+    cache = MenuCache(ttl=10 * 60)
+    clock.set(7, 5)
+    cache.set(('worcester', '2024-03-04'), menu('Omelette'))
+    clock.set(7, 14)
+    assert cache.get(('worcester', '2024-03-04')) is not None
+    clock.set(7, 15)
+    assert cache.get(('worcester', '2024-03-04')) is None
+
+
+def test_cache_evicts_least_recently_used_by_size():
+    menus = {location: menu(f'{location} special', f'{location} soup') for location in ('berkshire', 'franklin', 'worcester')}
+    size = max(estimate_size(items) for items in menus.values())
+    cache = MenuCache(max_bytes=2 * size)
+
+    cache.set(('berkshire', '2024-03-04'), menus['berkshire'])
+    cache.set(('franklin', '2024-03-04'), menus['franklin'])
+    # Reading berkshire makes franklin the least recently used entry
+    assert cache.get(('berkshire', '2024-03-04')) is not None
+    cache.set(('worcester', '2024-03-04'), menus['worcester'])
+
+    assert cache.get(('franklin', '2024-03-04')) is None
+    assert cache.get(('berkshire', '2024-03-04')) is not None
+    assert cache.get(('worcester', '2024-03-04')) is not None
+    stats = cache.stats()
+    assert stats['evictions'] == 1
+    assert stats['entries'] == 2
+    assert stats['bytes'] <= stats['max_bytes']
+
+    # An entry larger than the whole budget is still kept, alone
+    cache.set(('hampshire', '2024-03-04'), menu(*(f'dish {n}' for n in range(100))))
+    assert cache.stats()['entries'] == 1
+
+
+def test_cache_invalidate():
+    cache = MenuCache()
+    for key in (('berkshire', '2024-03-03'), ('berkshire', '2024-03-04'), ('franklin', '2024-03-04')):
+        cache.set(key, menu('Soup'))
+
+    assert cache.invalidate('berkshire') == 2
+    assert cache.get(('berkshire', '2024-03-04')) is None
+    assert cache.get(('franklin', '2024-03-04')) is not None
+    assert cache.invalidate() == 1
+    assert cache.stats()['bytes'] == 0
+
+
+def count_parses(scraper, monkeypatch):
+    parses = []
+    parse = scraper._parse_menu_page
+
+    def counted(*args):
+        parses.append(args[1])
+        return parse(*args)
+
+    monkeypatch.setattr(scraper, '_parse_menu_page', counted)
+    return parses
+
+
+def test_not_modified_reuses_parsed_items(scraper, monkeypatch):
+    def respond(url, headers):
+        if headers.get('If-None-Match') == '"v1"':
+            return response(url, 304)
+        return response(url, content=menu_page('Chicken Parmesan'),
+                        headers={'ETag': '"v1"', 'Last-Modified': 'Mon, 04 Mar 2024 10:00:00 GMT'})
+
+    scraper.session = StubSession(respond)
+    parses = count_parses(scraper, monkeypatch)
+
+    first = scraper.scrape_location('berkshire', use_cache=False)
+    second = scraper.scrape_location('berkshire', use_cache=False)
+
+    assert [item.name for item in second] == [item.name for item in first] == ['Chicken Parmesan']
+    assert parses == ['berkshire']
+    assert scraper.session.requests[0][1] == {}
+    assert scraper.session.requests[1][1] == {
+        'If-None-Match': '"v1"', 'If-Modified-Since': 'Mon, 04 Mar 2024 10:00:00 GMT',
+    }
+    assert scraper.stats()['conditional_fetch'] == {"not_modified": 1, "unchanged_content": 0}
+
+
+def test_unchanged_content_hash_skips_parsing(scraper, monkeypatch):
+    pages = {'berkshire': menu_page('Chicken Parmesan')}
+    scraper.session = StubSession(lambda url, headers: response(url, content=pages['berkshire']))
+    parses = count_parses(scraper, monkeypatch)
+
+    scraper.scrape_location('berkshire', use_cache=False)
+    assert [item.name for item in scraper.scrape_location('berkshire', use_cache=False)] == ['Chicken Parmesan']
+    assert parses == ['berkshire']
+    assert scraper.stats()['conditional_fetch'] == {"not_modified": 0, "unchanged_content": 1}
+
+    pages['berkshire'] = menu_page('Eggplant Parmesan')
+    assert [item.name for item in scraper.scrape_location('berkshire', use_cache=False)] == ['Eggplant Parmesan']
+    assert parses == ['berkshire', 'berkshire']
+
+
+def test_invalidate_forces_a_full_fetch(scraper, monkeypatch):
+    def respond(url, headers):
+        if headers.get('If-None-Match'):
+            return response(url, 304)
+        return response(url, content=menu_page('Chicken Parmesan'), headers={'ETag': '"v1"'})
+
+    scraper.session = StubSession(respond)
+    parses = count_parses(scraper, monkeypatch)
+
+    scraper.scrape_location('berkshire')
+    scraper.scrape_location('worcester')
+    # Served from the menu cache, without a request
+    scraper.scrape_location('berkshire')
+    assert len(scraper.session.requests) == 2
+
+    assert scraper.invalidate('berkshire') == 1
+    assert [item.name for item in scraper.scrape_location('berkshire')] == ['Chicken Parmesan']
+    assert scraper.session.requests[-1] == (scraper.all_locations['berkshire'], {})
+    assert parses == ['berkshire', 'worcester', 'berkshire']
+
+    # Worcester kept its validators
+    scraper.scrape_location('worcester', use_cache=False)
+    assert scraper.session.requests[-1][1] == {'If-None-Match': '"v1"'}
+    assert scraper.stats()['conditional_fetch']['not_modified'] == 1
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Tests for the in-memory food search index
+"""
+
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+from nutrition_scraper import NutritionData
+from search_index import FoodSearchIndex
+
+SNAPSHOTS = {
+    "berkshire": ["Chicken Parmesan", "Chicken Noodle Soup", "Eggplant Parmesan", "Jalapeño Poppers"],
+    "worcester": ["Chicken Parmesan Sub", "Grilled Chicken", "Parmesan Fries"],
+}
+
+
+@pytest.fixture
+def index():
+    return FoodSearchIndex({
+        location: [NutritionData(name=name) for name in names]
+        for location, names in SNAPSHOTS.items()
+    })
+
+
+def names(items):
+    return [item.name for item in items]
+
+
+def test_multi_token_query_intersects_postings(index):
+    assert names(index.search("chicken parm")) == ["Chicken Parmesan", "Chicken Parmesan Sub"]
+    assert names(index.search("parm chicken")) == ["Chicken Parmesan", "Chicken Parmesan Sub"]
+    assert names(index.search("chicken poppers")) == []
+
+
+def test_tokens_match_inside_words(index):
+    assert names(index.search("parme")) == [
+        "Chicken Parmesan", "Eggplant Parmesan", "Chicken Parmesan Sub", "Parmesan Fries",
+    ]
+    assert names(index.search("san")) == names(index.search("parmesan"))
+    assert names(index.search("jalapeno")) == ["Jalapeño Poppers"]
+
+
+def test_location_filter(index):
+    assert names(index.search("chicken", "worcester")) == ["Chicken Parmesan Sub", "Grilled Chicken"]
+    assert names(index.search("chicken", "berkshire")) == ["Chicken Parmesan", "Chicken Noodle Soup"]
+    assert names(index.search("fries", "berkshire")) == []
+    assert names(index.search("chicken", "hampshire")) == []
+
+
+def test_empty_query(index):
+    assert index.search("") == []
+    assert index.search("  -- ") == []
+
+
+def test_fuzzy_search_tolerates_typos(index):
+    assert index.search("chiken parm") == []
+    assert names(index.fuzzy_search("chiken parm")) == ["Chicken Parmesan", "Chicken Parmesan Sub"]
+    assert names(index.fuzzy_search("chiken parm", "worcester")) == ["Chicken Parmesan Sub"]
+
+
+def test_fuzzy_search_scores_exact_words_higher(index):
+    scored = dict(index.fuzzy_search_scored("chicken parmesan"))
+    typo_scored = dict(index.fuzzy_search_scored("chiken parmesan"))
+    assert scored[0] == 1.0
+    assert 0 < typo_scored[0] < 1.0
+
+
+def test_ranked_page_orders_by_match_quality(index):
+    items, total = index.ranked_page("parmesan", limit=10)
+    assert total == 4
+    # Prefix match first, then word matches in index order
+    assert names(items) == ["Parmesan Fries", "Chicken Parmesan", "Eggplant Parmesan", "Chicken Parmesan Sub"]
+
+
+def test_ranked_page_offset_and_limit(index):
+    full, total = index.ranked_page("chicken", limit=10)
+    assert total == 4
+
+    pages = []
+    for offset in range(0, total + 2, 2):
+        page, page_total = index.ranked_page("chicken", offset=offset, limit=2)
+        assert page_total == total
+        pages.append(names(page))
+    assert pages == [names(full[0:2]), names(full[2:4]), []]
+
+
+def test_ranked_page_boost_and_location(index):
+    boosted, _ = index.ranked_page(
+        "chicken", limit=10, boost=lambda item_id: 1.0 if index.item_locations[item_id] == "worcester" else 0.0
+    )
+    assert names(boosted[:2]) == ["Chicken Parmesan Sub", "Grilled Chicken"]
+
+    items, total = index.ranked_page("chicken", "berkshire", limit=1)
+    assert total == 2
+    assert names(items) == ["Chicken Parmesan"]
+
+
+def test_suggest_matches_word_starts(index):
+    assert index.suggest("parm") == ["Parmesan Fries", "Chicken Parmesan", "Eggplant Parmesan", "Chicken Parmesan Sub"]
+    assert index.suggest("noodle") == ["Chicken Noodle Soup"]
+    assert index.suggest("jalap", location="berkshire") == ["Jalapeño Poppers"]
+    assert index.suggest("jalap", location="worcester") == []
+    assert index.suggest("") == []
+
+
+def test_suggest_ranks_by_popularity_and_dedupes(index):
+    popularity = {"chicken parmesan sub": 5, "grilled chicken": 2}
+    assert index.suggest("chi", limit=3, popularity=popularity) == [
+        "Chicken Parmesan Sub", "Grilled Chicken", "Chicken Parmesan",
+    ]
+
+    duplicated = FoodSearchIndex({
+        "berkshire": [NutritionData(name="Grilled Chicken")],
+        "worcester": [NutritionData(name="grilled chicken")],
+    })
+    assert duplicated.suggest("gr") == ["Grilled Chicken"]
+
+
+def test_suggest_short_prefix_ranks_every_match():
+    index = FoodSearchIndex({
+        "berkshire": [NutritionData(name=f"Apple {n}") for n in range(300)]
+                     + [NutritionData(name=f"Cheese Dish {n:03}") for n in range(250)]
+                     + [NutritionData(name="Chicken Tenders")],
+        "worcester": [NutritionData(name="Apricot Tart")],
+    })
+    assert index.suggest("ap", location="worcester") == ["Apricot Tart"]
+    assert index.suggest("ch", limit=1, popularity={"chicken tenders": 500}) == ["Chicken Tenders"]
+
+    # Memoized short-prefix results follow a new popularity mapping
+    assert index.suggest("ch", limit=1, popularity={"cheese dish 249": 9}) == ["Cheese Dish 249"]
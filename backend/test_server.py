@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""
+Tests for API endpoints and helpers that don't need a database
+"""
+
+import sys
+import os
+import asyncio
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+os.environ.setdefault('MONGO_URL', 'mongodb://localhost:27017')
+os.environ.setdefault('DB_NAME', 'umacro_tracker_test')
+
+import pytest
+from fastapi import HTTPException
+from fastapi.testclient import TestClient
+
+import server
+from nutrition_scraper import NutritionData
+from password_hashing import HashingBusyError
+from search_index import FoodSearchIndex
+
+
+@pytest.fixture
+def client(monkeypatch):
+    monkeypatch.setattr(server.menu_store, 'index', FoodSearchIndex({
+        "berkshire": [NutritionData(name="Chicken Parmesan"), NutritionData(name="Chicken Tenders")],
+        "worcester": [NutritionData(name="Apricot Tart"), NutritionData(name="Grilled Chicken")],
+    }))
+    monkeypatch.setattr(server.menu_store, 'popularity', {"chicken tenders": 3})
+    # No `with`: startup would connect to MongoDB and start the menu scheduler
+    return TestClient(server.app)
+
+
+def test_suggest_ranks_by_popularity(client):
+    response = client.get("/api/food/suggest", params={"prefix": "chi"})
+    assert response.status_code == 200
+    assert response.json() == ["Chicken Tenders", "Grilled Chicken", "Chicken Parmesan"]
+
+
+def test_suggest_limit_and_location(client):
+    assert client.get("/api/food/suggest", params={"prefix": "ch", "limit": 1}).json() == ["Chicken Tenders"]
+    assert client.get("/api/food/suggest", params={"prefix": "a", "location": "Worcester Commons"}).json() == ["Apricot Tart"]
+    assert client.get("/api/food/suggest", params={"prefix": "a", "location": "Berkshire"}).json() == []
+
+
+def test_suggest_validates_input(client):
+    assert client.get("/api/food/suggest", params={"prefix": "  "}).json() == []
+    assert client.get("/api/food/suggest", params={"prefix": "ch", "limit": 50}).status_code == 422
+
+
+class BusyHasher:
+    async def hash(self, password):
+        raise HashingBusyError(7)
+
+    async def verify(self, plain_password, hashed_password):
+        raise HashingBusyError(7)
+
+
+@pytest.mark.parametrize("call", [
+    lambda: server.hash_password("secret"),
+    lambda: server.verify_password("secret", "$2b$12$hash"),
+])
+def test_busy_hasher_maps_to_503_with_retry_after(monkeypatch, call):
+    monkeypatch.setattr(server, 'password_hasher', BusyHasher())
+    with pytest.raises(HTTPException) as error:
+        asyncio.run(call())
+    assert error.value.status_code == 503
+    assert error.value.headers == {"Retry-After": "7"}
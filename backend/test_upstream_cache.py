@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Tests for the stale-while-revalidate upstream cache
+"""
+
+import sys
+import os
+import asyncio
+sys.path.append(os.path.dirname(os.path.abspath(__file__)))
+
+import pytest
+from upstream_cache import StaleWhileRevalidateCache
+
+
+class Upstream:
+    """Fetch function returning queued results, optionally held until released"""
+
+    def __init__(self, *results):
+        self.results = list(results)
+        self.calls = 0
+        self.release = asyncio.Event()
+        self.release.set()
+
+    async def fetch(self):
+        self.calls += 1
+        await self.release.wait()
+        result = self.results.pop(0)
+        if isinstance(result, Exception):
+            raise result
+        return result
+
+
+def test_cold_misses_share_one_fetch():
+    async def scenario():
+        upstream = Upstream(["Berkshire"])
+        upstream.release.clear()
+        cache = StaleWhileRevalidateCache("locations", upstream.fetch)
+
+        requests = [asyncio.create_task(cache.get()) for _ in range(3)]
+        await asyncio.sleep(0)
+        upstream.release.set()
+        assert await asyncio.gather(*requests) == [["Berkshire"]] * 3
+        assert upstream.calls == 1
+        assert cache.stats()["misses"] == 3
+
+        assert await cache.get() == ["Berkshire"]
+        assert upstream.calls == 1
+        assert cache.stats()["hits"] == 1
+
+    asyncio.run(scenario())
+
+
+def test_stale_value_served_while_refreshing():
+    async def scenario():
+        upstream = Upstream(["Berkshire"], ["Berkshire", "Worcester"])
+        cache = StaleWhileRevalidateCache("locations", upstream.fetch, ttl=0.05)
+        assert await cache.get() == ["Berkshire"]
+
+        await asyncio.sleep(0.06)
+        upstream.release.clear()
+        # Served at once although the refresh is still waiting on the upstream
+        assert await asyncio.wait_for(cache.get(), 0.5) == ["Berkshire"]
+        assert await asyncio.wait_for(cache.get(), 0.5) == ["Berkshire"]
+        upstream.release.set()
+        await asyncio.sleep(0.01)
+
+        assert await cache.get() == ["Berkshire", "Worcester"]
+        assert upstream.calls == 2
+        assert cache.stats()["stale_hits"] == 2
+
+    asyncio.run(scenario())
+
+
+def test_failed_refresh_keeps_last_good_copy():
+    async def scenario():
+        upstream = Upstream(["Berkshire"], RuntimeError("dining site down"), ["Worcester"])
+        cache = StaleWhileRevalidateCache("locations", upstream.fetch, ttl=0.05)
+        assert await cache.get() == ["Berkshire"]
+
+        await asyncio.sleep(0.06)
+        assert await cache.get() == ["Berkshire"]
+        await asyncio.sleep(0.01)
+        assert cache.stats()["refresh_errors"] == 1
+        # Still stale, so the next request retries the refresh
+        assert await cache.get() == ["Berkshire"]
+        await asyncio.sleep(0.01)
+        assert await cache.get() == ["Worcester"]
+
+    asyncio.run(scenario())
+
+
+def test_cold_miss_error_reaches_the_caller():
+    async def scenario():
+        upstream = Upstream(RuntimeError("dining site down"), ["Berkshire"])
+        cache = StaleWhileRevalidateCache("locations", upstream.fetch)
+        with pytest.raises(RuntimeError):
+            await cache.get()
+        assert await cache.get() == ["Berkshire"]
+
+    asyncio.run(scenario())
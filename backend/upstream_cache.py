@@ -0,0 +1,105 @@
+"""
+Stale-while-revalidate cache for slow upstream responses.
+
+Used for the dining site's location info: once a good copy exists, requests are served
+from it immediately while refreshes happen in the background, so page loads no longer
+wait on the dining site. Concurrent misses share one in-flight fetch, and a failed
+refresh keeps serving the last good copy.
+"""
+
+import asyncio
+import logging
+import time
+from typing import Any, Awaitable, Callable, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class StaleWhileRevalidateCache:
+    """Single-value async cache with a short TTL and stale-while-revalidate semantics"""
+
+    def __init__(self, name: str, fetch: Callable[[], Awaitable[Any]], ttl: float = 60.0):
+        self.name = name
+        self.fetch = fetch
+        self.ttl = ttl
+
+        self._value: Any = None
+        self._fetched_at: Optional[float] = None
+        self._inflight: Optional[asyncio.Task] = None
+        self._refresher: Optional[asyncio.Task] = None
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+        self.refresh_errors = 0
+
+    def _refresh(self) -> asyncio.Task:
+        """The in-flight refresh, starting one if none is running"""
+        if self._inflight is None or self._inflight.done():
+            self._inflight = asyncio.create_task(self._do_refresh())
+        return self._inflight
+
+    async def _do_refresh(self):
+        try:
+            value = await self.fetch()
+        except Exception as e:
+            self.refresh_errors += 1
+            logger.warning(f"Refreshing {self.name} failed: {e}")
+            raise
+        self._value = value
+        self._fetched_at = time.monotonic()
+        return value
+
+    async def get(self):
+        """Cached value; stale values are returned at once and refreshed in the background"""
+        if self._fetched_at is not None:
+            if time.monotonic() - self._fetched_at < self.ttl:
+                self.hits += 1
+            else:
+                self.stale_hits += 1
+                self._refresh().add_done_callback(_consume_exception)
+            return self._value
+
+        # Cold cache: wait for the shared fetch, which outlives a cancelled request
+        self.misses += 1
+        return await asyncio.shield(self._refresh())
+
+    async def _refresh_loop(self):
+        while True:
+            try:
+                await asyncio.shield(self._refresh())
+            except asyncio.CancelledError:
+                raise
+            except Exception:
+                pass
+            await asyncio.sleep(self.ttl)
+
+    def start(self):
+        """Keep the value fresh in the background"""
+        if self._refresher is None:
+            self._refresher = asyncio.create_task(self._refresh_loop())
+
+    async def stop(self):
+        for task in (self._refresher, self._inflight):
+            if task is not None and not task.done():
+                task.cancel()
+                try:
+                    await task
+                except (asyncio.CancelledError, Exception):
+                    pass
+        self._refresher = None
+        self._inflight = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "age_seconds": None if self._fetched_at is None else round(time.monotonic() - self._fetched_at, 1),
+            "hits": self.hits,
+            "stale_hits": self.stale_hits,
+            "misses": self.misses,
+            "refresh_errors": self.refresh_errors,
+        }
+
+
+def _consume_exception(task: asyncio.Task):
+    # Background refresh failures are already logged; keep serving the last good copy
+    if not task.cancelled():
+        task.exception()
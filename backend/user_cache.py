@@ -0,0 +1,50 @@
+"""
+Bounded TTL cache of authenticated users.
+
+``get_current_user`` runs on every authenticated request; caching the ``User`` by id
+turns the auth dependency into a JWT signature check on hot paths. Anything that
+changes or deletes a user must call ``invalidate`` (or ``clear``) so stale profiles
+are not served until the TTL runs out.
+"""
+
+import time
+from collections import OrderedDict
+from typing import Any, Dict, Optional
+
+
+class UserCache:
+    """LRU cache of user objects keyed by user id, with a per-entry TTL"""
+
+    def __init__(self, max_size: int = 10_000, ttl: float = 300.0):
+        self.max_size = max_size
+        self.ttl = ttl
+        self._entries: 'OrderedDict[str, tuple]' = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, user_id: str) -> Optional[Any]:
+        entry = self._entries.get(user_id)
+        if entry is None or entry[1] <= time.monotonic():
+            if entry is not None:
+                del self._entries[user_id]
+            self.misses += 1
+            return None
+        self._entries.move_to_end(user_id)
+        self.hits += 1
+        return entry[0]
+
+    def set(self, user_id: str, user: Any):
+        self._entries[user_id] = (user, time.monotonic() + self.ttl)
+        self._entries.move_to_end(user_id)
+        while len(self._entries) > self.max_size:
+            self._entries.popitem(last=False)
+
+    def invalidate(self, user_id: str):
+        """Drop one user, e.g. after their profile changes"""
+        self._entries.pop(user_id, None)
+
+    def clear(self):
+        self._entries.clear()
+
+    def stats(self) -> Dict[str, int]:
+        return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
@@ -242,6 +242,7 @@ function AuthPage() {
 function FoodSearch({ onFoodSelect, onToggleFavorite, isFavorite }) {
   const [searchQuery, setSearchQuery] = useState('');
   const [searchResults, setSearchResults] = useState([]);
+  const [suggestions, setSuggestions] = useState([]);
   const [loading, setLoading] = useState(false);
   const [selectedLocation, setSelectedLocation] = useState('');
   const [locations, setLocations] = useState([]);
@@ -259,14 +260,15 @@ function FoodSearch({ onFoodSelect, onToggleFavorite, isFavorite }) {
     }
   };
 
-  const handleSearch = async () => {
-    if (!searchQuery.trim()) return;
+  const handleSearch = async (query = searchQuery) => {
+    if (!query.trim()) return;
     
-    console.log('Searching for:', searchQuery, 'Location:', selectedLocation);
+    console.log('Searching for:', query, 'Location:', selectedLocation);
+    setSuggestions([]);
     setLoading(true);
     try {
       const response = await axios.get(`${API}/food/search`, {
-        params: { q: searchQuery, location: selectedLocation }
+        params: { q: query, location: selectedLocation }
       });
       console.log('Search response:', response.data.length, 'items');
       setSearchResults(response.data);
@@ -284,12 +286,36 @@ function FoodSearch({ onFoodSelect, onToggleFavorite, isFavorite }) {
     }
   };
 
+  const handleSuggestionSelect = (name) => {
+    setSearchQuery(name);
+    handleSearch(name);
+  };
+
+  // Live suggestions while typing
+  useEffect(() => {
+    if (!searchQuery.trim()) {
+      setSuggestions([]);
+      return;
+    }
+    const timer = setTimeout(async () => {
+      try {
+        const response = await axios.get(`${API}/food/suggest`, {
+          params: { prefix: searchQuery, location: selectedLocation }
+        });
+        setSuggestions(response.data);
+      } catch (error) {
+        console.error('Suggest error:', error);
+      }
+    }, 100);
+    return () => clearTimeout(timer);
+  }, [searchQuery, selectedLocation]);
+
   // Auto-search after user stops typing
   useEffect(() => {
     if (searchQuery.trim().length > 2) {
       const timer = setTimeout(() => {
         handleSearch();
-      }, 1000);
+      }, 300);
       return () => clearTimeout(timer);
     } else {
       setSearchResults([]);
@@ -306,6 +332,20 @@ function FoodSearch({ onFoodSelect, onToggleFavorite, isFavorite }) {
           onKeyPress={handleKeyPress}
           className="w-full"
         />
+        {suggestions.length > 0 && (
+          <div className="flex flex-wrap gap-2">
+            {suggestions.map((name) => (
+              <Badge
+                key={name}
+                variant="outline"
+                className="cursor-pointer hover:bg-gray-100"
+                onClick={() => handleSuggestionSelect(name)}
+              >
+                {name}
+              </Badge>
+            ))}
+          </div>
+        )}
         <div className="flex space-x-2">
           <select
             value={selectedLocation}
@@ -317,7 +357,7 @@ function FoodSearch({ onFoodSelect, onToggleFavorite, isFavorite }) {
               <option key={index} value={location.name}>{location.name}</option>
             ))}
           </select>
-          <Button onClick={handleSearch} disabled={loading} className="bg-umass-maroon hover:bg-red-800 text-white">
+          <Button onClick={() => handleSearch()} disabled={loading} className="bg-umass-maroon hover:bg-red-800 text-white">
             {loading ? '...' : <Search className="w-4 h-4" />}
           </Button>
         </div>
@@ -1156,7 +1196,6 @@ function Dashboard() {
   const [history, setHistory] = useState({});
   const [favorites, setFavorites] = useState([]);
   const [loading, setLoading] = useState(true);
-  const [mealsCache, setMealsCache] = useState({}); // Cache for meals by date
   const [macroGoals, setMacroGoals] = useState(() => {
     const saved = localStorage.getItem('macroGoals');
     return saved ? JSON.parse(saved) : { calories: 2000, protein: 150, carbs: 250, fat: 65 };
@@ -1165,19 +1204,10 @@ function Dashboard() {
 
   useEffect(() => {
     fetchDashboardData();
-    fetchFavorites();
 
     // Listen for meal logged events
     const handleMealLogged = () => {
-      // Clear cache for today's date to ensure fresh data
-      const todayStr = new Date().toLocaleDateString('en-CA');
-      setMealsCache(prev => {
-        const newCache = { ...prev };
-        delete newCache[todayStr];
-        return newCache;
-      });
       fetchDashboardData();
-      fetchHistory();
     };
     window.addEventListener('mealLogged', handleMealLogged);
     
@@ -1193,21 +1223,17 @@ function Dashboard() {
     };
   }, [currentDate]);
 
-  // Fetch history only once on component mount
-  useEffect(() => {
-    fetchHistory();
-  }, []);
-
   const fetchDashboardData = async () => {
     try {
       const dateStr = currentDate.toLocaleDateString('en-CA'); // Returns YYYY-MM-DD format in local timezone
-      const [macrosResponse, mealsResponse] = await Promise.all([
-        axios.get(`${API}/dashboard/macros/${dateStr}`),
-        getMealsForDate(dateStr)
-      ]);
+      // Macros, meals, 14-day history and favorites arrive in a single request
+      const response = await axios.get(`${API}/dashboard/${dateStr}?days=14`);
+      const { macros, meals, history, favorites } = response.data;
       
-      setMacros(macrosResponse.data);
-      setTodayMeals(mealsResponse);
+      setMacros(macros);
+      setTodayMeals(meals);
+      setHistory(history);
+      setFavorites(favorites);
     } catch (error) {
       console.error('Failed to fetch dashboard data:', error);
     } finally {
@@ -1215,47 +1241,6 @@ function Dashboard() {
     }
   };
 
-  const getMealsForDate = async (dateStr) => {
-    try {
-      // Check cache first
-      if (mealsCache[dateStr]) {
-        console.log('Using cached meals for date:', dateStr);
-        return mealsCache[dateStr];
-      }
-
-      // If it's today, use the today endpoint for real-time data
-      if (dateStr === new Date().toLocaleDateString('en-CA')) {
-        const response = await axios.get(`${API}/meals/today`);
-        const meals = response.data;
-        // Cache the meals
-        setMealsCache(prev => ({ ...prev, [dateStr]: meals }));
-        return meals;
-      } else {
-        // For previous days, fetch from backend
-        const response = await axios.get(`${API}/meals/date/${dateStr}`);
-        const meals = response.data || [];
-        // Cache the meals
-        setMealsCache(prev => ({ ...prev, [dateStr]: meals }));
-        return meals;
-      }
-    } catch (error) {
-      console.error('Failed to fetch meals for date:', dateStr, error);
-      return [];
-    }
-  };
-
-  const fetchHistory = async () => {
-    try {
-      const response = await axios.get(`${API}/meals/history?days=14`);
-      console.log('History data received:', response.data);
-      console.log('Today\'s date:', new Date().toLocaleDateString('en-CA'));
-      console.log('History dates:', Object.keys(response.data));
-      setHistory(response.data);
-    } catch (error) {
-      console.error('Failed to fetch history:', error);
-    }
-  };
-
   const fetchFavorites = async () => {
     try {
       const response = await axios.get(`${API}/favorites`);
@@ -1356,17 +1341,8 @@ function Dashboard() {
       await axios.delete(`${API}/meals/${mealId}`);
       toast.success('Meal deleted successfully');
       
-      // Clear cache for current date to ensure fresh data
-      const currentDateStr = currentDate.toLocaleDateString('en-CA');
-      setMealsCache(prev => {
-        const newCache = { ...prev };
-        delete newCache[currentDateStr];
-        return newCache;
-      });
-      
       // Refresh dashboard data
       fetchDashboardData();
-      fetchHistory();
     } catch (error) {
       console.error('Failed to delete meal:', error);
       toast.error('Failed to delete meal');